@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""End-to-end timings of update_readme.main() against the local stand-in server.
+
+Starts scripts/stub_server.py in-process, points GH_API_GRAPHQL and the blog
+feed at it, and runs main() in a scratch directory: a cold single-profile
+run, a warm one (validators, caches and the activity store in place) and a
+cold batch over --profiles logins. Injected latency and failures show how the
+fetch stage and the retry scheduler behave under a slow or flaky API.
+
+    python benchmarks/bench_end_to_end.py
+    python benchmarks/bench_end_to_end.py --latency 0.2 --error-rate 0.1 --profiles 20
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from stub_server import StubServer  # noqa: E402
+
+README = """# Benchmark profile
+
+<!-- DYNAMIC:START:blog -->
+<!-- DYNAMIC:END:blog -->
+
+<!-- DYNAMIC:START:stats -->
+<!-- DYNAMIC:END:stats -->
+"""
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def prepare(workdir, server, profiles):
+    with open(os.path.join(ROOT, ".github", "readme.config.json"), "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    cfg.setdefault("blog", {})["feeds"] = [server.url + "/rss"]
+    # Retries against injected failures should not stall the benchmark
+    cfg.setdefault("graphql", {})["max_rate_limit_wait"] = 5
+    write(os.path.join(workdir, "bench.config.json"), json.dumps(cfg, indent=2))
+    write(os.path.join(workdir, "README.md"), README)
+    manifest = {"profiles": [f"bench-{i}" for i in range(profiles)]}
+    write(os.path.join(workdir, "manifest.json"), json.dumps(manifest))
+    for i in range(profiles):
+        write(os.path.join(workdir, "profiles", f"bench-{i}", "README.md"), README)
+
+def timed(label, ur, argv):
+    started = time.perf_counter()
+    ur.main(argv)
+    seconds = time.perf_counter() - started
+    print(f"{label:<40} {seconds * 1000:>12.2f} ms", flush=True)
+    return seconds
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the stub adds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub responses that fail")
+    parser.add_argument("--repos", type=int, default=8, help="synthetic repositories per login")
+    parser.add_argument("--profiles", type=int, default=10, help="logins in the batch run")
+    parser.add_argument("--keep", action="store_true", help="leave the scratch directory in place")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="readme-e2e-")
+    server = StubServer(latency=args.latency, error_rate=args.error_rate, repos=args.repos).start()
+    cwd = os.getcwd()
+    try:
+        prepare(workdir, server, args.profiles)
+        os.environ.update({"GH_API_GRAPHQL": server.url + "/graphql", "GITHUB_TOKEN": "stub", "GH_LOGIN": "bench"})
+        os.chdir(workdir)
+        import update_readme as ur
+
+        config = ["--config", "bench.config.json"]
+        timed("main[cold]", ur, config + ["--refresh-all"])
+        timed("main[warm]", ur, config)
+        timed(f"main[batch, {args.profiles} profiles]", ur,
+              config + ["--refresh-all", "--batch", "manifest.json", "--summary", "batch-summary.json"])
+        print(f"{'stub requests':<40} {server.requests:>15}")
+    finally:
+        os.chdir(cwd)
+        server.stop()
+        if args.keep:
+            print(f"Scratch directory: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Offline scale benchmarks for scripts/update_readme.py.
+
+Generates GraphQL-shaped payloads at several sizes and times the activity
+store sync and stats queries, commit analysis, render and splice stages
+without touching the network. Each stage reports wall time (best of --repeat)
+and peak traced memory; results can be saved as baselines and later runs
+compared against them.
+
+    python benchmarks/bench_update_readme.py            # quick sizes
+    python benchmarks/bench_update_readme.py --full     # up to 10k repos / 1M commits
+    python benchmarks/bench_update_readme.py --save     # record baselines
+    python benchmarks/bench_update_readme.py --check    # fail on regressions
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+import datetime as dt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+import update_readme as ur  # noqa: E402
+from activity_store import ActivityStore  # noqa: E402
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+NOISE_FLOOR_SECONDS = 0.001
+
+QUICK_SIZES = {
+    "repos": [10, 100, 1000],
+    "commits": [1000, 10000, 100000],
+    "readme_mb": [0.1, 1],
+}
+FULL_SIZES = {
+    "repos": [10, 100, 1000, 10000],
+    "commits": [1000, 10000, 100000, 1000000],
+    "readme_mb": [0.1, 1, 5],
+}
+
+LANGUAGES = ["Python", "TypeScript", "JavaScript", "Go", "Rust", "CSS", "HTML", "MDX", "Astro", "Shell",
+             "Java", "C", "C++", "Ruby", "Handlebars"]
+TOPICS = ["react", "nextjs", "astro", "svelte", "vue", "django", "flask", "fastapi", "tailwind",
+          "docs", "cli", "education", "devrel", "bootstrap", "pytorch"]
+WORDS = ["parser", "render", "readme", "workflow", "session", "tutorial", "analytics", "sidebar",
+         "release", "header", "footer", "landing", "dashboard", "metrics", "tracing", "fixture",
+         "linter", "deploy", "preview", "config", "cache", "banner", "layout", "search"]
+PREFIXES = ["feat: ", "fix: ", "docs: ", "chore(deps): ", "", "", "oops ", "refactor: "]
+
+def iso(d):
+    return d.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def make_stats_user(n_repos, rng, now):
+    """A `stats` sync window (the last ACTIVITY_SYNC_DAYS days) with n_repos contributed repositories
+
+    Returns the slice and a repo details cache holding every repo's languages
+    and topics, so sync_activity() has nothing to fetch.
+    """
+    today = now.date()
+    repos = []
+    cache = {}
+    for i in range(n_repos):
+        name = f"bench/repo-{i}"
+        pushed_at = iso(now - dt.timedelta(days=rng.randint(0, 120)))
+        langs = rng.sample(LANGUAGES, rng.randint(1, 10))
+        edges = [{"size": rng.randint(100, 500000), "node": {"name": lang}} for lang in langs]
+        topics = rng.sample(TOPICS, rng.randint(0, 6))
+        cache[name] = ur.repo_details(name, pushed_at, {
+            "totalSize": sum(e["size"] for e in edges),
+            "pageInfo": {"hasNextPage": False, "endCursor": None},
+            "edges": edges,
+        }, {
+            "pageInfo": {"hasNextPage": False, "endCursor": None},
+            "nodes": [{"topic": {"name": t}} for t in topics],
+        })
+        days = rng.sample(range(ur.ACTIVITY_SYNC_DAYS), rng.randint(1, 40))
+        nodes = [{"occurredAt": iso(dt.datetime.combine(today - dt.timedelta(days=d), dt.time(12))),
+                  "commitCount": rng.randint(1, 12)} for d in sorted(days)]
+        repos.append({
+            "repository": {
+                "nameWithOwner": name,
+                "stargazerCount": rng.randint(0, 500),
+                "primaryLanguage": {"name": langs[0]},
+                "pushedAt": pushed_at,
+            },
+            "contributions": {"totalCount": len(nodes), "nodes": nodes},
+        })
+    user = {
+        "ytd": {"restrictedContributionsCount": rng.randint(0, 200)},
+        "contributionsCollection": {"commitContributionsByRepository": repos},
+    }
+    return user, cache
+
+def sync_into(path, user, cache):
+    """Cold sync of one window into a fresh activity store at path"""
+    if os.path.exists(path):
+        os.remove(path)
+    with ActivityStore(path) as store:
+        return ur.sync_activity(store, [user], None, repo_cache=dict(cache))
+
+def make_commit_user(n_commits, rng, now, per_repo=1000):
+    """A `commit_analysis` slice holding n_commits spread over repos of per_repo commits"""
+    repos = []
+    made = 0
+    while made < n_commits:
+        count = min(per_repo, n_commits - made)
+        nodes = []
+        for j in range(count):
+            when = now - dt.timedelta(minutes=(made + j) * 7)
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+            nodes.append({"oid": f"{made + j:040x}", "message": rng.choice(PREFIXES) + words,
+                          "committedDate": iso(when)})
+        repos.append({
+            "nameWithOwner": f"bench/repo-{len(repos)}",
+            "defaultBranchRef": {"target": {"history": {
+                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                "nodes": nodes,
+            }}},
+        })
+        made += count
+    return {
+        "contributionsCollection": {
+            "pullRequestContributions": {
+                "totalCount": 100,
+                "nodes": [{"pullRequest": {"merged": i % 3 != 0, "createdAt": iso(now)}} for i in range(100)],
+            }
+        },
+        "repositories": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": repos},
+    }
+
+def make_readme(megabytes):
+    """A README of about `megabytes` MB with the dynamic blocks in the middle"""
+    filler_line = "- Some curated highlight with a [link](https://example.com/some/long/path) and text.\n"
+    half = int(megabytes * 1024 * 1024 / 2 / len(filler_line)) or 1
+    filler = filler_line * half
+    return (filler + f"{ur.BLOG_START}\nold blog\n{ur.BLOG_END}\n" + filler
+            + f"{ur.STATS_START}\nold stats\n{ur.STATS_END}\n" + filler)
+
+def measure(fn, repeat):
+    """Best wall time over `repeat` runs, plus peak traced memory of one extra run"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+def run(sizes, repeat):
+    rng = random.Random(1234)
+    now = dt.datetime.now(ur.TZ)
+    results = {}
+
+    def record(stage, size, seconds, peak):
+        key = f"{stage}[{size}]"
+        results[key] = {"seconds": round(seconds, 6), "peak_bytes": peak}
+        print(f"{key:<40} {seconds * 1000:>12.2f} ms {peak / 1024 / 1024:>10.2f} MiB", flush=True)
+
+    stats_by_size = {}
+    workdir = tempfile.mkdtemp(prefix="readme-bench-")
+    for n in sizes["repos"]:
+        user, cache = make_stats_user(n, rng, now)
+        path = os.path.join(workdir, f"activity-{n}.sqlite")
+        _, seconds, peak = measure(lambda: sync_into(path, user, cache), repeat)
+        record("sync_activity", f"{n} repos", seconds, peak)
+        with ActivityStore(path) as store:
+            stats, seconds, peak = measure(lambda: ur.stats_from_activity(store, now, repo_cache=cache), repeat)
+        stats_by_size[n] = stats
+        record("stats_from_activity", f"{n} repos", seconds, peak)
+        os.remove(path)
+    os.rmdir(workdir)
+
+    analysis = None
+    for n in sizes["commits"]:
+        user = make_commit_user(n, rng, now)
+        random.seed(0)
+        analysis, seconds, peak = measure(lambda: ur.parse_commit_analysis(user, {}, now), 1 if n >= 100000 else repeat)
+        record("parse_commit_analysis", f"{n} commits", seconds, peak)
+        del user
+
+    for n, stats in stats_by_size.items():
+        stats = dict(stats, commit_analysis=analysis)
+        _, seconds, peak = measure(lambda: ur.render_stats_block(stats), repeat)
+        record("render_stats_block", f"{n} repos", seconds, peak)
+
+    block = ur.render_stats_block(dict(stats_by_size[min(stats_by_size)], commit_analysis=analysis))
+    for mb in sizes["readme_mb"]:
+        content = make_readme(mb)
+
+        _, seconds, peak = measure(lambda: ur.splice_blocks(content, {"blog": "new blog\n", "stats": block}), repeat)
+        record("splice_blocks", f"{mb} MB", seconds, peak)
+    return results
+
+def compare(results, baselines, threshold):
+    """Print stages slower than threshold x their baseline; return how many regressed"""
+    regressions = 0
+    for key, current in results.items():
+        base = baselines.get(key)
+        # Sub-millisecond stages are dominated by timer noise
+        if not base or max(base.get("seconds", 0), current["seconds"]) < NOISE_FLOOR_SECONDS:
+            continue
+        ratio = current["seconds"] / base["seconds"]
+        if ratio > threshold:
+            regressions += 1
+            print(f"[regression] {key}: {current['seconds']:.4f}s vs baseline {base['seconds']:.4f}s ({ratio:.1f}x)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="include the largest payload sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is kept)")
+    parser.add_argument("--save", action="store_true", help="write results to the baselines file")
+    parser.add_argument("--check", action="store_true", help="exit non-zero if any stage regressed")
+    parser.add_argument("--threshold", type=float, default=1.5, help="slowdown ratio counted as a regression")
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    args = parser.parse_args(argv)
+
+    print(f"{'stage':<40} {'time':>15} {'peak':>14}")
+    results = run(FULL_SIZES if args.full else QUICK_SIZES, max(1, args.repeat))
+
+    baselines = {}
+    if os.path.isfile(args.baselines):
+        with open(args.baselines, "r", encoding="utf-8") as f:
+            baselines = json.load(f).get("results", {})
+    regressions = compare(results, baselines, args.threshold)
+
+    if args.save:
+        merged = dict(baselines, **results)
+        with open(args.baselines, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": merged}, f, indent=2, sort_keys=True)
+        print(f"Baselines written to {args.baselines}")
+    if args.check and regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
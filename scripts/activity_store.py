@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Local SQLite time series of daily commit activity.
+
+Commits are kept in daily buckets per repository, and per repository and
+language (the repo's commits split by its language byte shares at the time
+they were recorded). Totals for any date range, such as year to date, the
+last N days or a week-over-week comparison, are indexed range queries, so
+the API is only needed for days not stored yet: the last day synced is kept
+in the meta table, so quiet stretches with no commits are not requested
+again. Past calendar years, once fetched in full, are marked in
+history_years and never fetched again. Writes
+only touch rows whose values changed, so a sync that brings nothing new
+leaves the file byte-for-byte alone.
+"""
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repo_days (
+    day TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    commits INTEGER NOT NULL,
+    PRIMARY KEY (day, repo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS repo_days_by_repo ON repo_days (repo, day);
+CREATE TABLE IF NOT EXISTS language_days (
+    day TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    language TEXT NOT NULL,
+    commits REAL NOT NULL,
+    PRIMARY KEY (day, repo, language)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS repos (
+    repo TEXT PRIMARY KEY,
+    stars INTEGER NOT NULL DEFAULT 0,
+    pushed_at TEXT,
+    is_private INTEGER NOT NULL DEFAULT 0,
+    is_fork INTEGER NOT NULL DEFAULT 0,
+    primary_language TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS history_years (
+    year INTEGER PRIMARY KEY,
+    restricted INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+REPO_FIELDS = ("stars", "pushed_at", "is_private", "is_fork", "primary_language")
+REPO_DEFAULTS = {"stars": 0, "is_private": 0, "is_fork": 0}
+
+class ActivityStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        # Checked against the newest table, so older files gain it
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'meta'").fetchone():
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def last_day(self):
+        """The newest day with any stored activity ("YYYY-MM-DD"), or None when empty"""
+        return self.conn.execute("SELECT MAX(day) FROM repo_days").fetchone()[0]
+
+    def synced_through(self):
+        """The last day a sync covered ("YYYY-MM-DD"), or None before the first one"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'synced_through'").fetchone()
+        return row[0] if row else None
+
+    def mark_synced(self, day):
+        """Record that every day up to `day` ("YYYY-MM-DD") has been synced"""
+        if self.synced_through() == day:
+            return
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_through', ?)", (day,))
+
+    def record(self, repo_days, shares=None, repos=None):
+        """Upsert daily buckets and repo metadata, writing only what changed
+
+        `repo_days` maps (day, repo) to that day's commit count, `shares` maps
+        repo to {language: fraction of its bytes}, and `repos` maps repo to a
+        dict with any of REPO_FIELDS; fields it leaves out keep their stored
+        values. Returns the number of buckets changed.
+        """
+        shares = shares or {}
+        repos = repos or {}
+        changed = []
+        if repo_days:
+            first = min(day for day, _ in repo_days)
+            stored = {(day, repo): commits for day, repo, commits in self.conn.execute(
+                "SELECT day, repo, commits FROM repo_days WHERE day >= ?", (first,))}
+            changed = [(key, commits) for key, commits in repo_days.items() if stored.get(key) != commits]
+
+        stored_repos = {row[0]: row[1:] for row in self.conn.execute(
+            f"SELECT repo, {', '.join(REPO_FIELDS)} FROM repos")}
+        repo_rows = []
+        for repo, meta in repos.items():
+            stored = dict(zip(REPO_FIELDS, stored_repos.get(repo) or ()))
+            row = tuple(meta[field] if field in meta else stored.get(field, REPO_DEFAULTS.get(field))
+                        for field in REPO_FIELDS)
+            if stored_repos.get(repo) != row:
+                repo_rows.append((repo,) + row)
+
+        if not changed and not repo_rows:
+            return 0
+        with self.conn:
+            for (day, repo), commits in changed:
+                self.conn.execute("INSERT OR REPLACE INTO repo_days (day, repo, commits) VALUES (?, ?, ?)",
+                                  (day, repo, commits))
+                self.conn.execute("DELETE FROM language_days WHERE day = ? AND repo = ?", (day, repo))
+                self.conn.executemany(
+                    "INSERT INTO language_days (day, repo, language, commits) VALUES (?, ?, ?, ?)",
+                    [(day, repo, language, commits * share) for language, share in (shares.get(repo) or {}).items()])
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO repos (repo, {', '.join(REPO_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                repo_rows)
+        return len(changed)
+
+    def total(self, since, until=None):
+        """Commits on days in [since, until] (ISO dates; until defaults to open-ended)"""
+        row = self.conn.execute("SELECT COALESCE(SUM(commits), 0) FROM repo_days WHERE day >= ? AND day <= ?",
+                                (since, until or "9999-12-31")).fetchone()
+        return row[0]
+
+    def repo_totals(self, since, until=None):
+        """{repo: commits} over [since, until]"""
+        return dict(self.conn.execute(
+            "SELECT repo, SUM(commits) FROM repo_days WHERE day >= ? AND day <= ? GROUP BY repo",
+            (since, until or "9999-12-31")))
+
+    def language_totals(self, since, active_since=None):
+        """{language: commits} since `since`, limited to repos with commits since `active_since`"""
+        sql = "SELECT language, SUM(commits) FROM language_days WHERE day >= ?"
+        params = [since]
+        if active_since is not None:
+            sql += " AND repo IN (SELECT DISTINCT repo FROM repo_days WHERE day >= ?)"
+            params.append(active_since)
+        return dict(self.conn.execute(sql + " GROUP BY language", params))
+
+    def repo_meta(self):
+        return {row[0]: dict(zip(REPO_FIELDS, row[1:])) for row in self.conn.execute(
+            f"SELECT repo, {', '.join(REPO_FIELDS)} FROM repos")}
+
+    def history_years(self):
+        """{year: restricted commits} of the past years stored in full"""
+        return dict(self.conn.execute("SELECT year, restricted FROM history_years"))
+
+    def record_year(self, year, repo_days, shares=None, repos=None, restricted=0):
+        """record() a whole past year's buckets and mark the year as complete"""
+        changed = self.record(repo_days, shares, repos)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO history_years (year, restricted) VALUES (?, ?)",
+                              (int(year), int(restricted or 0)))
+        return changed
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Run-wide time budget for update_readme.py.
+
+A Deadline is set once per run with `with deadline_scope(Deadline(seconds)):`
+and kept in a contextvar. Like the metrics span, it follows work handed to
+thread pools through submit_in_context(). HTTP calls shorten their timeouts
+to what is left of it, retries and budget waits refuse to sleep past it,
+and paging loops stop at it, so one slow endpoint cannot hold a run past its
+budget. Running out raises DeadlineExceeded, a TimeoutError.
+"""
+import time
+import contextlib
+import contextvars
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+class Deadline:
+    def __init__(self, seconds=None, clock=time.monotonic):
+        self.seconds = None if seconds is None else float(seconds)
+        self._clock = clock
+        self.expires_at = None if seconds is None else clock() + self.seconds
+
+    def remaining(self):
+        """Seconds left, or None without a limit"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self, what="continuing"):
+        if self.expired():
+            raise DeadlineExceeded(f"Run deadline of {self.seconds:g}s reached before {what}")
+
+    def timeout(self, default, what="request"):
+        """A per-call timeout: `default`, cut down to what is left of the deadline"""
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        self.check(what)
+        return min(default, remaining)
+
+    def allows(self, seconds):
+        """Whether waiting `seconds` still leaves time before the deadline"""
+        remaining = self.remaining()
+        return remaining is None or seconds < remaining
+
+UNLIMITED = Deadline()
+
+_current = contextvars.ContextVar("deadline", default=UNLIMITED)
+
+def current():
+    return _current.get()
+
+@contextlib.contextmanager
+def deadline_scope(deadline):
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
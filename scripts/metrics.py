@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Lightweight run instrumentation for update_readme.py.
+
+Code under `with METRICS.span("name"):` is timed, and counters reported while
+it runs (bytes received, HTTP statuses, cache hits, GraphQL cost) are added
+to that span and every span enclosing it. The current span lives in a
+contextvar, so work handed to a thread pool through submit_in_context() still
+reports to the span that started it.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+import contextvars
+import datetime as dt
+
+DEFAULT_HISTORY = 50
+
+_current = contextvars.ContextVar("metrics_span", default=None)
+
+class Span:
+    def __init__(self, name, parent=None, **attrs):
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+        self.children = []
+        self.counters = {}
+        self.http_statuses = []
+        self.error = None
+        self.started_at = dt.datetime.now(dt.timezone.utc)
+        self._started = time.perf_counter()
+        self.wall_ms = None
+
+    def finish(self):
+        self.wall_ms = round((time.perf_counter() - self._started) * 1000, 2)
+
+    def records(self, prefix=""):
+        """Flatten this span and its children into a list of JSON-able dicts"""
+        path = f"{prefix}/{self.name}" if prefix else self.name
+        record = {"span": path, "wall_ms": self.wall_ms}
+        record.update(self.attrs)
+        record.update(self.counters)
+        if self.http_statuses:
+            record["http_status"] = self.http_statuses
+        if self.error:
+            record["error"] = self.error
+        out = [record]
+        for child in self.children:
+            out.extend(child.records(path))
+        return out
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        parent = _current.get()
+        span = Span(name, parent, **attrs)
+        if parent is not None:
+            with self._lock:
+                parent.children.append(span)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.finish()
+            _current.reset(token)
+
+    def add(self, **counters):
+        """Add counters to the current span and all of its ancestors"""
+        span = _current.get()
+        with self._lock:
+            while span is not None:
+                for key, value in counters.items():
+                    span.counters[key] = span.counters.get(key, 0) + value
+                span = span.parent
+
+    def observe_http(self, timing):
+        """Transport observer: one finished HTTP request"""
+        span = _current.get()
+        if span is not None:
+            with self._lock:
+                span.http_statuses.append(timing["status"])
+        self.add(requests=1, bytes=timing["bytes"], http_ms=round(timing["elapsed"] * 1000, 2))
+
+def submit_in_context(pool, fn, *args):
+    """pool.submit() that runs fn inside a copy of the caller's context (and span)"""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+def append_run(path, record, history=DEFAULT_HISTORY):
+    """Append a run record to the metrics file, keeping only the last `history` runs"""
+    runs = []
+    if os.path.isfile(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                runs = json.load(f).get("runs", [])
+        except Exception:
+            runs = []
+    runs.append(record)
+    runs = runs[-history:]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"runs": runs}, f, indent=1)
+    os.replace(tmp, path)
+
+def print_summary(records, file=sys.stderr):
+    for r in records:
+        depth = r["span"].count("/")
+        parts = [f"{r['wall_ms']:.0f}ms" if r.get("wall_ms") is not None else "-"]
+        if r.get("bytes"):
+            parts.append(f"{r['bytes'] / 1024:.1f}KB")
+        if r.get("requests"):
+            parts.append(f"{r['requests']} req")
+        if r.get("cache_hits") or r.get("cache_misses"):
+            parts.append(f"cache {r.get('cache_hits', 0)}/{r.get('cache_hits', 0) + r.get('cache_misses', 0)}")
+        if r.get("graphql_cost"):
+            parts.append(f"cost {r['graphql_cost']}")
+        if r.get("error"):
+            parts.append(f"error: {r['error']}")
+        name = r["span"].rsplit("/", 1)[-1]
+        print(f"[metrics] {'  ' * depth}{name}: {', '.join(parts)}", file=file)
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""GitHub GraphQL point-budget tracking and request scheduling.
+
+estimate_query_cost() applies GitHub's published cost formula to a query
+before it is sent. GraphQLScheduler keeps track of the remaining budget across
+calls (and threads), lets cheap queries go ahead of expensive ones, waits for
+the budget to reset when it runs out, and retries secondary-rate-limit and
+transient 5xx responses with jittered exponential backoff. None of those
+waits runs past the current run deadline (see deadline.py).
+"""
+import re
+import json
+import time
+import heapq
+import random
+import itertools
+import threading
+import datetime as dt
+
+import deadline as run_deadline
+
+RETRY_STATUSES = (500, 502, 503, 504)
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_MAX_WAIT = 3600.0
+
+_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|#[^\n]*|[{}()]|[A-Za-z_]\w*\s*:\s*\$?\w+|[^\s{}()"#]+')
+_PAGE_ARG = re.compile(r"(?<![$\w])(first|last|maxRepositories)\s*:\s*(\$?\w+)")
+
+class RateLimitExceeded(RuntimeError):
+    pass
+
+def estimate_query_cost(query, variables=None):
+    """Estimate a query's point cost the way GitHub computes it
+
+    Every connection (a field taking `first`/`last`) costs one request per
+    parent node that may hold it; the total is divided by 100, minimum 1.
+    """
+    variables = variables or {}
+    requests = 0
+    # Multiplier for the selection set at each brace depth
+    scopes = [1]
+    pending = None
+    args = None
+    for token in _TOKEN.findall(query):
+        if token.startswith('"') or token.startswith("#"):
+            continue
+        if token == "(":
+            args = []
+            continue
+        if token == ")":
+            size = None
+            for name, value in _PAGE_ARG.findall(" ".join(args or [])):
+                if value.startswith("$"):
+                    value = variables.get(value[1:])
+                try:
+                    size = int(value)
+                except (TypeError, ValueError):
+                    size = 100
+            pending = size
+            args = None
+            continue
+        if args is not None:
+            args.append(token)
+            continue
+        if token == "{":
+            if pending:
+                requests += scopes[-1]
+                scopes.append(scopes[-1] * pending)
+            else:
+                scopes.append(scopes[-1])
+            pending = None
+            continue
+        if token == "}":
+            if len(scopes) > 1:
+                scopes.pop()
+            continue
+        pending = None
+    return max(1, round(requests / 100))
+
+def parse_reset(value):
+    """Epoch seconds from a resetAt ISO timestamp or an x-ratelimit-reset header"""
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return dt.datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+def header(headers, name):
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+class GraphQLScheduler:
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, max_wait=DEFAULT_MAX_WAIT,
+                 sleep=time.sleep, clock=time.time):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self._sleep = sleep
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        # Last known budget; None until the first response tells us
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        # Accounting across every call made through this scheduler
+        self.requests = 0
+        self.retries = 0
+        self.total_cost = 0
+        self.estimated_cost = 0
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "reset_at": self.reset_at,
+                "requests": self.requests,
+                "retries": self.retries,
+                "total_cost": self.total_cost,
+                "estimated_cost": self.estimated_cost,
+            }
+
+    def _budget_wait(self, cost):
+        """Seconds to wait before `cost` points fit in the budget (0 when they do)"""
+        if self.remaining is None or self.remaining >= cost:
+            return 0
+        now = self._clock()
+        if self.reset_at is None or self.reset_at <= now:
+            # The window has rolled over; the next response will tell us the new budget
+            self.remaining = None
+            return 0
+        return self.reset_at - now + 1
+
+    def _acquire(self, cost):
+        deadline = run_deadline.current()
+        with self._cond:
+            ticket = (cost, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket and self._in_flight < self.max_in_flight:
+                        wait = self._budget_wait(cost)
+                        if wait <= 0:
+                            break
+                        if wait > self.max_wait:
+                            raise RateLimitExceeded(
+                                f"GraphQL budget exhausted ({self.remaining} left, need {cost}); "
+                                f"resets in {int(wait)}s")
+                        if not deadline.allows(wait):
+                            raise run_deadline.DeadlineExceeded(
+                                f"GraphQL budget resets in {int(wait)}s, after the run deadline")
+                        # Deferred until resetAt; release the lock while we sleep
+                        self._cond.release()
+                        try:
+                            self._sleep(wait)
+                        finally:
+                            self._cond.acquire()
+                        # The window has reset; the next response reports the new budget
+                        self.remaining = None
+                        continue
+                    deadline.check("a GraphQL slot freed up")
+                    self._cond.wait(timeout=1.0)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+            self._in_flight += 1
+            if self.remaining is not None:
+                self.remaining -= cost
+            self.estimated_cost += cost
+            self._cond.notify_all()
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def observe_headers(self, headers):
+        remaining = header(headers, "x-ratelimit-remaining")
+        limit = header(headers, "x-ratelimit-limit")
+        reset = parse_reset(header(headers, "x-ratelimit-reset"))
+        with self._cond:
+            if remaining is not None and str(remaining).isdigit():
+                self.remaining = int(remaining)
+            if limit is not None and str(limit).isdigit():
+                self.limit = int(limit)
+            if reset is not None:
+                self.reset_at = reset
+
+    def observe_rate_limit(self, rate_limit):
+        """Fold a `rateLimit { cost remaining resetAt limit }` payload into the budget"""
+        if not rate_limit:
+            return
+        with self._cond:
+            self.total_cost += int(rate_limit.get("cost") or 0)
+            if rate_limit.get("remaining") is not None:
+                self.remaining = int(rate_limit["remaining"])
+            if rate_limit.get("limit") is not None:
+                self.limit = int(rate_limit["limit"])
+            reset = parse_reset(rate_limit.get("resetAt"))
+            if reset is not None:
+                self.reset_at = reset
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except (TypeError, ValueError):
+                pass
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def _classify(self, code, body, headers):
+        """Return None for a usable response, else the seconds to wait before retrying"""
+        text = body.decode("utf-8", errors="ignore") if isinstance(body, bytes) else str(body or "")
+        if code in (403, 429):
+            if header(headers, "x-ratelimit-remaining") == "0":
+                reset = parse_reset(header(headers, "x-ratelimit-reset"))
+                return max(1.0, (reset or self._clock()) - self._clock() + 1)
+            if header(headers, "retry-after") is not None or "secondary rate limit" in text.lower():
+                return "backoff"
+            return None
+        if code in RETRY_STATUSES:
+            return "backoff"
+        if code == 200 and '"RATE_LIMITED"' in text:
+            try:
+                errors = json.loads(text).get("errors") or []
+            except ValueError:
+                errors = []
+            if any(e.get("type") == "RATE_LIMITED" for e in errors):
+                reset = parse_reset(header(headers, "x-ratelimit-reset"))
+                return max(1.0, (reset or self._clock()) - self._clock() + 1)
+        return None
+
+    def execute(self, send, cost=1):
+        """Run send() -> (status, body, headers) under the budget, retrying when GitHub pushes back"""
+        attempt = 0
+        while True:
+            self._acquire(cost)
+            try:
+                try:
+                    code, body, headers = send()
+                except run_deadline.DeadlineExceeded:
+                    raise
+                except OSError:
+                    # Timeouts and dropped connections are worth another try too
+                    if attempt >= self.max_retries:
+                        raise
+                    code, body, headers = None, b"", {}
+                with self._cond:
+                    self.requests += 1
+            finally:
+                self._release()
+
+            if code is not None:
+                self.observe_headers(headers)
+                verdict = self._classify(code, body, headers)
+                if verdict is None:
+                    return code, body, headers
+            else:
+                verdict = "backoff"
+            if attempt >= self.max_retries:
+                return code, body, headers
+            if verdict == "backoff":
+                wait = self._backoff(attempt, header(headers, "retry-after"))
+            else:
+                wait = verdict
+            if wait > self.max_wait:
+                raise RateLimitExceeded(f"GraphQL rate limited; retry would wait {int(wait)}s")
+            if not run_deadline.current().allows(wait):
+                raise run_deadline.DeadlineExceeded(f"GraphQL retry would wait {wait:.1f}s, past the run deadline")
+            attempt += 1
+            with self._cond:
+                self.retries += 1
+            self._sleep(wait)
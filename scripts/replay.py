@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Record and replay HTTP traffic for offline runs of update_readme.py.
+
+RecordingTransport is a Transport that also saves every response it receives
+as a JSON fixture. ReplayTransport serves those fixtures without touching the
+network, with optional injected latency and failures. The failures are
+decided by a seeded hash of the request and how many times it has been made,
+so a replayed run behaves the same way every time. Both can stand in for the
+module-level TRANSPORT through update_readme.use_transport().
+"""
+import os
+import json
+import time
+import base64
+import random
+import hashlib
+import tempfile
+import threading
+import contextlib
+
+from transport import Transport, Response
+
+class FixtureNotFound(LookupError):
+    pass
+
+def fixture_key(method, url, body=None, loose=False):
+    """Stable key for a request: JSON bodies are compared by value, not by formatting
+
+    A `loose` key ignores GraphQL variables, so fixtures recorded on another
+    day (whose date variables differ) can still answer the same query.
+    """
+    if isinstance(body, (bytes, bytearray)):
+        try:
+            parsed = json.loads(body.decode("utf-8"))
+            if loose and isinstance(parsed, dict) and "query" in parsed:
+                parsed = {"query": parsed["query"]}
+            body = json.dumps(parsed, sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            body = base64.b64encode(bytes(body)).decode("ascii")
+    payload = json.dumps([method.upper(), url, body or ""] + (["loose"] if loose else []))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def encode_body(body):
+    try:
+        return {"body": body.decode("utf-8"), "encoding": "utf-8"}
+    except UnicodeDecodeError:
+        return {"body": base64.b64encode(body).decode("ascii"), "encoding": "base64"}
+
+def decode_body(fixture):
+    if fixture.get("encoding") == "base64":
+        return base64.b64decode(fixture.get("body") or "")
+    return (fixture.get("body") or "").encode("utf-8")
+
+def header(headers, name):
+    for key, value in (headers or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+class RecordingTransport(Transport):
+    """A live Transport that writes each final response to `directory`
+
+    Each response is saved under its exact key and under its loose key.
+    """
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, method, url, body, status, headers, payload):
+        fixture = {"method": method, "url": url, "status": status, "headers": headers}
+        fixture.update(encode_body(payload))
+        for loose in (False, True):
+            path = os.path.join(self.directory, fixture_key(method, url, body, loose=loose) + ".json")
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(fixture, f, indent=1, sort_keys=True)
+            os.replace(tmp, path)
+
+    def request(self, method, url, body=None, headers=None, timeout=15, max_bytes=None):
+        resp = super().request(method, url, body=body, headers=headers, timeout=timeout, max_bytes=max_bytes)
+        # A 304 only means something next to the 200 recorded earlier
+        if resp.status != 304:
+            self.save(method, url, body, resp.status, resp.headers, resp.body)
+        return resp
+
+    @contextlib.contextmanager
+    def stream(self, method, url, body=None, headers=None, timeout=15, max_bytes=None):
+        with super().stream(method, url, body=body, headers=headers, timeout=timeout, max_bytes=max_bytes) as resp:
+            chunks = []
+
+            def tee():
+                for chunk in resp.body:
+                    chunks.append(chunk)
+                    yield chunk
+
+            body_iter = tee()
+            yield resp._replace(body=body_iter)
+            # Read whatever the caller left so the fixture holds the whole body
+            for _ in body_iter:
+                pass
+            if resp.status != 304:
+                self.save(method, url, body, resp.status, resp.headers, b"".join(chunks))
+
+class ReplayTransport(Transport):
+    """Serves recorded fixtures, optionally slowed down and made to fail
+
+    Every request sleeps `latency` seconds plus up to `jitter` more. A
+    fraction `error_rate` of requests fail instead: with HTTP `error_status`,
+    or as a dropped connection when error_status is 0. GETs carrying an
+    If-None-Match that matches the fixture's ETag get a 304, like a server
+    would send.
+    """
+
+    def __init__(self, directory, latency=0.0, jitter=0.0, error_rate=0.0, error_status=502, seed=0, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.error_rate = float(error_rate)
+        self.error_status = int(error_status)
+        self.seed = seed
+        self.served = {}
+        self._fixtures = {}
+        self._count_lock = threading.Lock()
+
+    def load(self, key):
+        if key not in self._fixtures:
+            path = os.path.join(self.directory, key + ".json")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._fixtures[key] = json.load(f)
+            except FileNotFoundError:
+                self._fixtures[key] = None
+        return self._fixtures[key]
+
+    def _serve(self, method, url, body, headers, timeout=None):
+        """Return (status, payload, headers) for a request, after the injected delay
+
+        A delay longer than `timeout` ends in a TimeoutError at the timeout,
+        as a real socket would.
+        """
+        key = fixture_key(method, url, body)
+        with self._count_lock:
+            attempt = self.served.get(key, 0)
+            self.served[key] = attempt + 1
+        rng = random.Random(f"{self.seed}:{key}:{attempt}")
+        delay = self.latency + self.jitter * rng.random()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Replayed {method} {url} timed out after {timeout:.1f}s")
+        if delay > 0:
+            time.sleep(delay)
+        if rng.random() < self.error_rate:
+            if self.error_status == 0:
+                raise ConnectionResetError(f"Injected connection reset for {method} {url}")
+            return self.error_status, b'{"message": "Injected failure"}', {"Content-Type": "application/json"}
+
+        fixture = self.load(key) or self.load(fixture_key(method, url, body, loose=True))
+        if fixture is None:
+            raise FixtureNotFound(f"No fixture for {method} {url} in {self.directory}")
+        response_headers = dict(fixture.get("headers") or {})
+        etag = header(response_headers, "ETag")
+        if etag and header(headers, "If-None-Match") == etag:
+            return 304, b"", response_headers
+        return int(fixture["status"]), decode_body(fixture), response_headers
+
+    def request(self, method, url, body=None, headers=None, timeout=15, max_bytes=None):
+        started = time.perf_counter()
+        status, payload, response_headers = self._serve(method, url, body, headers, timeout)
+        elapsed = self._record(method, url, status, started, len(payload))
+        return Response(status, payload, response_headers, url, elapsed, len(payload))
+
+    @contextlib.contextmanager
+    def stream(self, method, url, body=None, headers=None, timeout=15, max_bytes=None):
+        started = time.perf_counter()
+        status, payload, response_headers = self._serve(method, url, body, headers, timeout)
+        chunks = (payload[i:i + 65536] for i in range(0, len(payload), 65536))
+        try:
+            yield Response(status, chunks, response_headers, url, time.perf_counter() - started, len(payload))
+        finally:
+            self._record(method, url, status, started, len(payload))
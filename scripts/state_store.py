@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""SQLite-backed run state for update_readme.py.
+
+Replaces the whole-file rewrites of state.json. The state of each README
+(its "scope", the state path it used to live at) is split into keyed rows:
+feed validators, per-repo commit cursors, and one JSON row per remaining
+top-level key. Saving compares each row with the ones last loaded or
+written and writes only those that changed, in one transaction, so a killed
+run leaves the last good state behind and a run that changed nothing leaves
+the file alone. A scope's state.json is migrated on its first load and then
+removed.
+
+A scope is still loaded whole: every run digests all of it (see
+state_fingerprint() in update_readme.py) and the blog, stats and commit
+sections between them touch every table, so keyed reads would only add
+queries. The primary keys keep those loads and the per-row writes indexed.
+
+The response cache and run metrics change on every run and are not worth
+committing, so they live in a second file attached to the same connection.
+Both are opened in WAL mode; one connection, guarded by a lock, is shared by
+every thread of the process (batch workers included).
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (scope, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS validators (
+    scope TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    value TEXT NOT NULL,
+    PRIMARY KEY (scope, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cursors (
+    scope TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (scope, repo)
+) WITHOUT ROWID;
+"""
+
+LOCAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS local.responses (
+    key TEXT PRIMARY KEY,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL,
+    sections TEXT NOT NULL,
+    data TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS local.responses_by_last_used ON responses (last_used);
+CREATE TABLE IF NOT EXISTS local.metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT,
+    record TEXT NOT NULL
+);
+"""
+
+# Validator columns of a feed's state; the rest of it is kept as JSON
+VALIDATOR_FIELDS = ("etag", "last_modified")
+DEFAULT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+def dumps(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+def cache_key(query, variables):
+    """SHA-256 of a query's text and variables"""
+    payload = json.dumps({"query": query, "variables": variables}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def split_state(state):
+    """{(table, key): row values} for a state dict"""
+    rows = {}
+    for key, value in state.items():
+        if key == "feeds":
+            for url, feed in (value or {}).items():
+                rest = {k: v for k, v in feed.items() if k not in VALIDATOR_FIELDS}
+                rows[("validators", url)] = tuple(feed.get(k) for k in VALIDATOR_FIELDS) + (dumps(rest),)
+            continue
+        if key == "commit_history" and isinstance(value, dict):
+            for repo, cursor in (value.get("repos") or {}).items():
+                rows[("cursors", repo)] = (dumps(cursor),)
+            value = {k: v for k, v in value.items() if k != "repos"}
+        rows[("kv", key)] = (dumps(value),)
+    return rows
+
+class StateStore:
+    def __init__(self, path, local_path):
+        self.path = path
+        self.local_path = local_path
+        for p in (path, local_path):
+            os.makedirs(os.path.dirname(p) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        # {scope: rows} as last loaded or written, so save() need not read them back
+        self._rows = {}
+        # One connection for every thread; the lock serializes its use
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("ATTACH DATABASE ? AS local", (local_path,))
+        for schema in ("main", "local"):
+            self.conn.execute(f"PRAGMA {schema}.journal_mode = WAL")
+            self.conn.execute(f"PRAGMA {schema}.synchronous = NORMAL")
+        if not self.conn.execute("SELECT 1 FROM main.sqlite_master WHERE name = 'cursors'").fetchone():
+            self.conn.executescript(SCHEMA)
+        if not self.conn.execute("SELECT 1 FROM local.sqlite_master WHERE name = 'metrics'").fetchone():
+            self.conn.executescript(LOCAL_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _stored_rows(self, scope):
+        rows = {}
+        for key, value in self.conn.execute("SELECT key, value FROM kv WHERE scope = ?", (scope,)):
+            rows[("kv", key)] = (value,)
+        for url, etag, last_modified, value in self.conn.execute(
+                "SELECT url, etag, last_modified, value FROM validators WHERE scope = ?", (scope,)):
+            rows[("validators", url)] = (etag, last_modified, value)
+        for repo, value in self.conn.execute("SELECT repo, value FROM cursors WHERE scope = ?", (scope,)):
+            rows[("cursors", repo)] = (value,)
+        return rows
+
+    def load(self, scope, json_path=None):
+        """The state dict of `scope`, migrating `json_path` (a state.json) into it on first use"""
+        with self._lock:
+            rows = self._stored_rows(scope)
+            self._rows[scope] = rows
+            if not rows and json_path and os.path.isfile(json_path):
+                return self.migrate(scope, json_path)
+        state = {}
+        for (table, key), values in rows.items():
+            if table == "kv":
+                state[key] = json.loads(values[0])
+            elif table == "validators":
+                feed = {k: v for k, v in zip(VALIDATOR_FIELDS, values) if v is not None}
+                feed.update(json.loads(values[-1]))
+                state.setdefault("feeds", {})[key] = feed
+        cursors = {key: json.loads(values[0]) for (table, key), values in rows.items() if table == "cursors"}
+        if cursors:
+            history = state.get("commit_history")
+            if not isinstance(history, dict):
+                history = state["commit_history"] = {}
+            history["repos"] = cursors
+        return state
+
+    def migrate(self, scope, json_path):
+        """Move a state.json into `scope`; the file is removed once its rows are committed"""
+        with open(json_path, "r", encoding="utf-8") as f:
+            try:
+                state = json.load(f)
+            except ValueError:
+                # Corrupt from an interrupted write; nothing in it can be trusted
+                state = {}
+        self.save(scope, state)
+        os.remove(json_path)
+        return state
+
+    def save(self, scope, state):
+        """Write the rows of `state` that differ from the stored ones, in one transaction
+
+        Returns the number of rows written or deleted.
+        """
+        rows = split_state(state)
+        with self._lock:
+            stored = self._rows.get(scope)
+            if stored is None:
+                stored = self._stored_rows(scope)
+            changed = [(key, values) for key, values in rows.items() if stored.get(key) != values]
+            removed = [key for key in stored if key not in rows]
+            if not changed and not removed:
+                return 0
+            with self.conn:
+                for (table, key), values in changed:
+                    if table == "validators":
+                        self.conn.execute("INSERT OR REPLACE INTO validators (scope, url, etag, last_modified, value) "
+                                          "VALUES (?, ?, ?, ?, ?)", (scope, key) + values)
+                    elif table == "cursors":
+                        self.conn.execute("INSERT OR REPLACE INTO cursors (scope, repo, value) VALUES (?, ?, ?)",
+                                          (scope, key) + values)
+                    else:
+                        self.conn.execute("INSERT OR REPLACE INTO kv (scope, key, value) VALUES (?, ?, ?)",
+                                          (scope, key) + values)
+                for table, key in removed:
+                    column = {"validators": "url", "cursors": "repo"}.get(table, "key")
+                    self.conn.execute(f"DELETE FROM {table} WHERE scope = ? AND {column} = ?", (scope, key))
+            self._rows[scope] = rows
+        return len(changed) + len(removed)
+
+    def append_metrics(self, record, history):
+        """Keep a run record, dropping all but the last `history` runs"""
+        with self._lock, self.conn:
+            self.conn.execute("INSERT INTO local.metrics (started_at, record) VALUES (?, ?)",
+                              (record.get("started_at"), json.dumps(record)))
+            self.conn.execute("DELETE FROM local.metrics WHERE id NOT IN "
+                              "(SELECT id FROM local.metrics ORDER BY id DESC LIMIT ?)", (history,))
+
+class ResponseCache:
+    """GraphQL responses in the state store's `responses` table, keyed by cache_key()
+
+    Freshness is checked against a per-section TTL at read time, and the
+    least recently used entries are evicted once the cache grows past
+    `max_bytes`.
+    """
+
+    def __init__(self, store, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, ttl):
+        """Return the cached data for key if it is younger than ttl seconds, else None"""
+        if not ttl or ttl <= 0:
+            return None
+        store = self.store
+        with store._lock:
+            row = store.conn.execute("SELECT stored_at, data FROM local.responses WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[0] > ttl:
+                self.misses += 1
+                return None
+            with store.conn:
+                store.conn.execute("UPDATE local.responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(row[1])
+
+    def put(self, key, data, sections=()):
+        raw = json.dumps(data, separators=(",", ":"))
+        now = time.time()
+        store = self.store
+        with store._lock, store.conn:
+            store.conn.execute("INSERT OR REPLACE INTO local.responses "
+                               "(key, stored_at, last_used, size, sections, data) VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, now, now, len(raw), dumps(sorted(sections)), raw))
+            total = store.conn.execute("SELECT COALESCE(SUM(size), 0) FROM local.responses").fetchone()[0]
+            if total > self.max_bytes:
+                evict = []
+                for old, size in store.conn.execute("SELECT key, size FROM local.responses ORDER BY last_used"):
+                    if total <= self.max_bytes:
+                        break
+                    evict.append((old,))
+                    total -= size
+                store.conn.executemany("DELETE FROM local.responses WHERE key = ?", evict)
+
+    def invalidate(self, key=None, section=None):
+        """Drop one key, every entry tagged with section, or (with neither) the whole cache"""
+        store = self.store
+        with store._lock, store.conn:
+            if key is not None:
+                store.conn.execute("DELETE FROM local.responses WHERE key = ?", (key,))
+            elif section is not None:
+                keys = [(k,) for k, sections in store.conn.execute("SELECT key, sections FROM local.responses")
+                        if section in json.loads(sections)]
+                store.conn.executemany("DELETE FROM local.responses WHERE key = ?", keys)
+            else:
+                store.conn.execute("DELETE FROM local.responses")
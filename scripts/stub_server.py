@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Local stand-in for the GitHub GraphQL API and a blog feed.
+
+Serves synthetic but deterministic data shaped like the queries that
+update_readme.py sends, so main() and batch runs can be timed end to end
+without a network:
+
+    python scripts/stub_server.py --port 8765 --latency 0.05
+    GH_API_GRAPHQL=http://127.0.0.1:8765/graphql GITHUB_TOKEN=x GH_LOGIN=someone \\
+        python scripts/update_readme.py --config stub.config.json
+
+POST /graphql answers the aliased user parts (stats, commit_analysis, and
+the w0, w1, ... windows of a past year's history), the batched repo details (r0, r1, ...) and rateLimit. It sends X-RateLimit-*
+headers and runs down a request budget, after which it answers 403 until
+the budget resets. GET /rss serves an RSS feed with an ETag and
+Last-Modified, and answers 304 to a matching conditional request. Latency
+and a failure rate can be injected into both.
+"""
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+import email.utils
+import datetime as dt
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LANGUAGES = ["Python", "TypeScript", "JavaScript", "Go", "Rust", "CSS", "HTML", "MDX", "Astro", "Shell"]
+TOPICS = ["react", "nextjs", "astro", "svelte", "django", "flask", "fastapi", "tailwind", "docs", "cli"]
+WORDS = ["parser", "render", "readme", "workflow", "session", "tutorial", "analytics", "sidebar",
+         "release", "header", "landing", "dashboard", "metrics", "tracing", "config", "cache"]
+PREFIXES = ["feat: ", "fix: ", "docs: ", "chore(deps): ", "", "refactor: "]
+
+USER_PART = re.compile(r"(\w+): user\(login:")
+HISTORY_PART = re.compile(r"w(\d+)")
+REPO_PART = re.compile(r"(r\d+): repository\(")
+
+def iso(d):
+    return d.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def parse_time(value, default):
+    try:
+        return dt.datetime.fromisoformat(str(value).replace("Z", "+00:00")).astimezone(dt.timezone.utc)
+    except (TypeError, ValueError):
+        return default
+
+class StubData:
+    """Deterministic synthetic activity for any login"""
+
+    def __init__(self, seed=0, repos=8, posts=10, years=5):
+        self.seed = seed
+        self.repos = repos
+        self.posts = posts
+        self.years = years
+
+    def rng(self, *parts):
+        return random.Random(":".join(str(p) for p in (self.seed,) + parts))
+
+    def repo_names(self, login):
+        return [f"{login}/project-{i}" for i in range(self.repos)]
+
+    def commits_on(self, repo, day):
+        rng = self.rng(repo, day.isoformat())
+        return rng.randint(1, 9) if rng.random() < 0.4 else 0
+
+    def repository(self, name):
+        rng = self.rng(name, "meta")
+        return {
+            "nameWithOwner": name,
+            "isPrivate": False,
+            "isFork": False,
+            "stargazerCount": rng.randint(0, 300),
+            "primaryLanguage": {"name": LANGUAGES[rng.randrange(len(LANGUAGES))]},
+            "pushedAt": iso(dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(hours=rng.randint(0, 8000))),
+        }
+
+    def stats(self, login, variables, now, since="syncFrom", until="to"):
+        first = parse_time(variables.get(since) or variables.get("fromYear"), now).date()
+        last = min(parse_time(variables.get(until), now).date(), now.date())
+        items = []
+        total = 0
+        for name in self.repo_names(login):
+            nodes = []
+            day = first
+            while day <= last:
+                count = self.commits_on(name, day)
+                if count:
+                    nodes.append({"occurredAt": f"{day.isoformat()}T07:00:00Z", "commitCount": count})
+                day += dt.timedelta(days=1)
+            if nodes:
+                total += sum(n["commitCount"] for n in nodes)
+                items.append({"repository": self.repository(name),
+                              "contributions": {"totalCount": len(nodes), "nodes": nodes[::-1][:100]}})
+        return {
+            "ytd": {"totalCommitContributions": total, "restrictedContributionsCount": self.rng(login).randint(0, 50)},
+            "contributionsCollection": {"totalCommitContributions": total, "commitContributionsByRepository": items},
+            "years": {"contributionYears": list(range(now.year, now.year - self.years, -1))},
+        }
+
+    def commit_analysis(self, login, variables, now):
+        since = parse_time(variables.get("since"), now - dt.timedelta(days=365))
+        page = int(variables.get("pageSize") or 50)
+        repos = []
+        for name in self.repo_names(login)[:page]:
+            rng = self.rng(name, "history")
+            nodes = []
+            when = now.replace(minute=0, second=0, microsecond=0)
+            while when >= since and len(nodes) < page:
+                words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+                nodes.append({"oid": hashlib.sha1(f"{name}{iso(when)}".encode()).hexdigest(),
+                              "message": rng.choice(PREFIXES) + words, "committedDate": iso(when)})
+                when -= dt.timedelta(hours=rng.randint(1, 48))
+            repos.append({"nameWithOwner": name, "defaultBranchRef": {"target": {"history": {
+                "pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": nodes}}}})
+        prs = [{"pullRequest": {"merged": i % 4 != 0, "createdAt": iso(now - dt.timedelta(days=i))}} for i in range(40)]
+        return {
+            "contributionsCollection": {"pullRequestContributions": {"totalCount": len(prs), "nodes": prs}},
+            "repositories": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": repos},
+        }
+
+    def repo_details(self, name):
+        rng = self.rng(name, "details")
+        langs = rng.sample(LANGUAGES, rng.randint(1, 4))
+        edges = [{"size": rng.randint(1000, 200000), "node": {"name": lang}} for lang in langs]
+        return dict(self.repository(name), **{
+            "languages": {"totalSize": sum(e["size"] for e in edges),
+                          "pageInfo": {"hasNextPage": False, "endCursor": None}, "edges": edges},
+            "repositoryTopics": {"pageInfo": {"hasNextPage": False, "endCursor": None},
+                                 "nodes": [{"topic": {"name": t}} for t in rng.sample(TOPICS, rng.randint(0, 3))]},
+        })
+
+    def graphql(self, query, variables, now):
+        data = {}
+        login = variables.get("login") or "stub"
+        for alias in USER_PART.findall(query):
+            if alias == "stats":
+                data[alias] = self.stats(login, variables, now)
+            elif alias == "commit_analysis":
+                data[alias] = self.commit_analysis(login, variables, now)
+            elif HISTORY_PART.fullmatch(alias):
+                i = alias[1:]
+                data[alias] = self.stats(login, variables, now, since="from" + i, until="to" + i)
+            else:
+                data[alias] = {}
+        for alias in REPO_PART.findall(query):
+            i = alias[1:]
+            data[alias] = self.repo_details(f"{variables.get('owner' + i)}/{variables.get('name' + i)}")
+        # Follow-up page queries: every connection above fits in one page
+        if not data and "repository(owner:" in query:
+            data["repository"] = None
+        return data
+
+    def rss(self):
+        items = []
+        for i in range(self.posts):
+            published = dt.datetime(2025, 10, 1, 9, tzinfo=dt.timezone.utc) - dt.timedelta(days=7 * i)
+            items.append(f"<item><title>Stub post {i}</title><link>https://blog.example/posts/{i}</link>"
+                         f"<guid>stub-{i}</guid><pubDate>{email.utils.format_datetime(published)}</pubDate></item>")
+        return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Stub blog</title>'
+                + "".join(items) + "</channel></rss>").encode("utf-8")
+
+class StubServer:
+    """A ThreadingHTTPServer on a background thread; use as a context manager"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, error_status=502,
+                 rate_limit=5000, reset_after=60, seed=0, repos=8, posts=10):
+        self.data = StubData(seed=seed, repos=repos, posts=posts)
+        self.latency = float(latency)
+        self.error_rate = float(error_rate)
+        self.error_status = int(error_status)
+        self.rate_limit = int(rate_limit)
+        self.reset_after = int(reset_after)
+        self.remaining = self.rate_limit
+        self.reset_at = time.time() + self.reset_after
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def spend(self):
+        """Take one request from the budget; returns (allowed, rate-limit headers)"""
+        with self._lock:
+            self.requests += 1
+            now = time.time()
+            if now >= self.reset_at:
+                self.remaining = self.rate_limit
+                self.reset_at = now + self.reset_after
+            allowed = self.remaining > 0
+            if allowed:
+                self.remaining -= 1
+            failed = self._rng.random() < self.error_rate
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.remaining),
+                "X-RateLimit-Used": str(self.rate_limit - self.remaining),
+                "X-RateLimit-Reset": str(int(self.reset_at)),
+            }
+        return allowed, failed, headers
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def delay(self):
+                if server.latency > 0:
+                    time.sleep(server.latency)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                self.delay()
+                if self.path.rstrip("/") != "/graphql":
+                    return self.reply(404)
+                allowed, failed, headers = server.spend()
+                headers["Content-Type"] = "application/json"
+                if not allowed:
+                    body = json.dumps({"message": "API rate limit exceeded"}).encode("utf-8")
+                    return self.reply(403, body, headers)
+                if failed:
+                    return self.reply(server.error_status, b'{"message": "Stub failure"}', headers)
+                now = dt.datetime.now(dt.timezone.utc)
+                query = payload.get("query") or ""
+                data = server.data.graphql(query, payload.get("variables") or {}, now)
+                if "rateLimit" in query:
+                    data["rateLimit"] = {"cost": 1, "remaining": int(headers["X-RateLimit-Remaining"]),
+                                         "limit": server.rate_limit,
+                                         "resetAt": iso(dt.datetime.fromtimestamp(server.reset_at, dt.timezone.utc))}
+                self.reply(200, json.dumps({"data": data}).encode("utf-8"), headers)
+
+            def do_GET(self):
+                self.delay()
+                if self.path.split("?")[0].rstrip("/") != "/rss":
+                    return self.reply(404)
+                _, failed, _ = server.spend()
+                if failed:
+                    return self.reply(server.error_status)
+                body = server.data.rss()
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                headers = {"ETag": etag, "Last-Modified": "Wed, 01 Oct 2025 09:00:00 GMT",
+                           "Content-Type": "application/rss+xml"}
+                if self.headers.get("If-None-Match") == etag:
+                    return self.reply(304, b"", headers)
+                self.reply(200, body, headers)
+
+        return Handler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve stand-in GitHub GraphQL and RSS endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=502, help="HTTP status of injected failures")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="requests allowed per reset window")
+    parser.add_argument("--reset-after", type=int, default=60, help="seconds in a rate-limit window")
+    parser.add_argument("--repos", type=int, default=8, help="synthetic repositories per login")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.host, args.port, latency=args.latency, error_rate=args.error_rate,
+                        error_status=args.error_status, rate_limit=args.rate_limit,
+                        reset_after=args.reset_after, seed=args.seed, repos=args.repos)
+    print(f"GH_API_GRAPHQL={server.url}/graphql")
+    print(f"BLOG_RSS_URL={server.url}/rss")
+    sys.stdout.flush()
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
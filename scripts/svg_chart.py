@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Dependency-free SVG bar chart of language percentages.
+
+render_language_svg() turns the (name, pct) pairs that summarize_stats()
+produces into a small standalone SVG. The output depends only on its input,
+so the same languages always give byte-identical files.
+"""
+from xml.sax.saxutils import escape
+
+BACKGROUND = "#0d1117"
+TEXT = "#f0f6fc"
+MUTED = "#8b949e"
+TRACK = "#21262d"
+FONT = "-apple-system, BlinkMacSystemFont, 'Segoe UI', Helvetica, Arial, sans-serif"
+
+# GitHub linguist colours for the languages that usually show up
+LANGUAGE_COLORS = {
+    "Python": "#3572A5",
+    "JavaScript": "#f1e05a",
+    "TypeScript": "#3178c6",
+    "MDX": "#fcb32c",
+    "CSS": "#563d7c",
+    "HTML": "#e34c26",
+    "Handlebars": "#f7931e",
+    "Go": "#00ADD8",
+    "Rust": "#dea584",
+    "Java": "#b07219",
+    "C++": "#f34b7d",
+    "C": "#555555",
+    "Shell": "#89e051",
+    "Ruby": "#701516",
+    "Astro": "#ff5a03",
+    "Svelte": "#ff3e00",
+    "Vue": "#41b883",
+    "Jupyter Notebook": "#DA5B0B",
+}
+FALLBACK_COLORS = ["#2f81f7", "#a371f7", "#3fb950", "#d29922", "#db61a2", "#f85149"]
+
+def render_language_svg(languages, title="Programming Languages", width=480, bar_height=14, row_gap=12):
+    """Horizontal bar chart of (name, pct) pairs as an SVG document string"""
+    languages = list(languages)
+    pad = 20
+    label_width = 130
+    pct_width = 44
+    title_height = 44
+    bar_width = width - 2 * pad - label_width - pct_width
+    row = bar_height + row_gap
+    height = title_height + max(1, len(languages)) * row + pad - row_gap
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" role="img" aria-label="{escape(title)}">',
+        f'<rect width="{width}" height="{height}" rx="8" fill="{BACKGROUND}"/>',
+        f'<text x="{pad}" y="{pad + 10}" fill="{TEXT}" font-family="{FONT}" font-size="16" '
+        f'font-weight="600">{escape(title)}</text>',
+    ]
+    if not languages:
+        out.append(f'<text x="{pad}" y="{title_height + bar_height - 2}" fill="{MUTED}" '
+                   f'font-family="{FONT}" font-size="12">No language data</text>')
+    fallback = 0
+    for i, (name, pct) in enumerate(languages):
+        color = LANGUAGE_COLORS.get(name)
+        if color is None:
+            color = FALLBACK_COLORS[fallback % len(FALLBACK_COLORS)]
+            fallback += 1
+        y = title_height + i * row
+        filled = round(bar_width * max(0, min(100, pct)) / 100, 1)
+        text_y = y + bar_height - 3
+        out.append(f'<text x="{pad}" y="{text_y}" fill="{TEXT}" font-family="{FONT}" '
+                   f'font-size="12">{escape(name)}</text>')
+        out.append(f'<rect x="{pad + label_width}" y="{y}" width="{bar_width}" height="{bar_height}" '
+                   f'rx="3" fill="{TRACK}"/>')
+        if filled > 0:
+            out.append(f'<rect x="{pad + label_width}" y="{y}" width="{filled}" height="{bar_height}" '
+                       f'rx="3" fill="{color}"/>')
+        out.append(f'<text x="{width - pad}" y="{text_y}" fill="{MUTED}" font-family="{FONT}" '
+                   f'font-size="12" text-anchor="end">{pct}%</text>')
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Commit-message text analytics for update_readme.py.
+
+CommitTextAnalyzer strips conventional-commit prefixes, tokenizes messages in
+batches with patterns compiled once, and spots "oops" commits with a single
+alternation regex. Word frequencies go into a SpaceSaving summary: at most
+`capacity` words are tracked, so memory stays flat however many commits are
+folded in, and summaries from different runs (or repos) can be merged.
+"""
+import re
+import heapq
+from collections import Counter
+
+DEFAULT_CAPACITY = 500
+DEFAULT_BATCH_SIZE = 1000
+
+CONVENTIONAL_PREFIX = re.compile(r"^(feat|fix|docs|style|refactor|test|chore)[\(:].*?[\):]\s*")
+WORD = re.compile(r"\b\w{4,}\b")
+OOPS_KEYWORDS = ("oops", "plz work", "please work", "dammit", "fix")
+OOPS = re.compile("|".join(re.escape(k) for k in OOPS_KEYWORDS))
+
+# Common commit words and generic terms that say nothing about the work
+EXCLUDED_WORDS = frozenset({
+    "feat", "fix", "add", "update", "remove", "delete", "change", "modify",
+    "create", "make", "implement", "improve", "refactor", "clean", "bump",
+    "merge", "initial", "commit", "changes", "files", "code", "work",
+    "with", "from", "for", "and", "the", "this", "that", "more", "some",
+})
+
+class SpaceSaving:
+    """Bounded, mergeable heavy-hitters summary (Metwally et al.'s Space-Saving)
+
+    Each tracked word carries [count, error]: count over-estimates the true
+    frequency by at most error. Words that fall out of the top `capacity`
+    are forgotten; one that comes back inherits the smallest tracked count as
+    its error.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, counts=None):
+        self.capacity = max(1, int(capacity))
+        self.counts = {word: list(entry) for word, entry in (counts or {}).items()}
+        self._trim()
+
+    @classmethod
+    def from_dict(cls, data, capacity=None):
+        data = data or {}
+        return cls(capacity or data.get("capacity", DEFAULT_CAPACITY), data.get("counts"))
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "counts": self.counts}
+
+    def floor(self):
+        """Smallest tracked count once full: the most an untracked word can have been seen"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counts.values())
+
+    def _trim(self):
+        if len(self.counts) > self.capacity:
+            keep = heapq.nlargest(self.capacity, self.counts.items(), key=lambda kv: kv[1][0])
+            self.counts = dict(keep)
+
+    def _combine(self, other_counts, other_floor):
+        own_floor = self.floor()
+        merged = {}
+        for word in self.counts.keys() | other_counts.keys():
+            count, error = self.counts.get(word, (own_floor, own_floor))
+            other_count, other_error = other_counts.get(word, (other_floor, other_floor))
+            merged[word] = [count + other_count, error + other_error]
+        self.counts = merged
+        self._trim()
+
+    def update(self, exact_counts):
+        """Fold in exact counts for a batch (a Counter or word -> int mapping)"""
+        self._combine({word: (n, 0) for word, n in exact_counts.items()}, 0)
+
+    def merge(self, other):
+        """Fold another summary into this one"""
+        self._combine(other.counts, other.floor())
+
+    def most_common(self, n=None):
+        """(word, count) pairs, highest first
+
+        count is the guaranteed lower bound (tracked count minus its error),
+        so a word that only just displaced another is not credited with the
+        evicted word's occurrences.
+        """
+        items = ((word, count - error) for word, (count, error) in self.counts.items())
+        if n is None:
+            return sorted(items, key=lambda kv: kv[1], reverse=True)
+        return heapq.nlargest(n, items, key=lambda kv: kv[1])
+
+class CommitTextAnalyzer:
+    """Accumulates word frequencies and "oops" commits over a stream of messages"""
+
+    def __init__(self, words=None, capacity=DEFAULT_CAPACITY, batch_size=DEFAULT_BATCH_SIZE):
+        self.words = words if words is not None else SpaceSaving(capacity)
+        self.batch_size = max(1, int(batch_size))
+        self.messages = 0
+        self.oops = 0
+        self._batch = []
+
+    def add(self, message):
+        self._batch.append((message or "").lower())
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Tokenize the pending batch into the word summary"""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        self.messages += len(batch)
+        self.oops += sum(1 for message in batch if OOPS.search(message))
+        # Prefixes are anchored per message; the words of the whole batch are
+        # then found in one scan (\w never spans the joining newline)
+        text = "\n".join(CONVENTIONAL_PREFIX.sub("", message, count=1) for message in batch)
+        counts = Counter(WORD.findall(text))
+        for word in EXCLUDED_WORDS.intersection(counts):
+            del counts[word]
+        self.words.update(counts)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Pooled keep-alive HTTP(S) transport used by update_readme.py.
+
+One SSL context is shared by every connection, idle connections are kept per
+host and reused, gzip bodies are decompressed as they stream in and every
+response is capped at a maximum size. stream() hands the body out chunk by
+chunk so callers can stop reading early. Bodies are read as the bytes arrive
+and the current run deadline (see deadline.py) is checked between reads, so
+a server trickling a response cannot hold a run past its budget.
+
+Like urlopen, requests go through the proxies named by HTTP_PROXY/HTTPS_PROXY
+unless NO_PROXY exempts the host: https is tunnelled with CONNECT and plain
+http is sent to the proxy with the absolute URL.
+"""
+import time
+import ssl
+import contextlib
+import zlib
+import threading
+import base64
+import http.client
+import urllib.parse
+import urllib.request
+from collections import deque, namedtuple
+
+import deadline as run_deadline
+
+MAX_RESPONSE_BYTES = 16 * 1024 * 1024
+MAX_IDLE_PER_HOST = 4
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+
+Response = namedtuple("Response", "status body headers url elapsed bytes_received")
+
+class ResponseTooLarge(RuntimeError):
+    pass
+
+def proxy_auth_headers(proxy_parts):
+    """Proxy-Authorization for the user:password in a split proxy URL, if any"""
+    if proxy_parts.username is None:
+        return {}
+    user = urllib.parse.unquote(proxy_parts.username)
+    password = urllib.parse.unquote(proxy_parts.password or "")
+    token = base64.b64encode(f"{user}:{password}".encode("utf-8")).decode("ascii")
+    return {"Proxy-Authorization": f"Basic {token}"}
+
+class Transport:
+    def __init__(self, max_bytes=MAX_RESPONSE_BYTES, max_idle_per_host=MAX_IDLE_PER_HOST, history=256, proxies=None):
+        self.max_bytes = max_bytes
+        self.max_idle_per_host = max_idle_per_host
+        self.ssl_context = ssl.create_default_context()
+        # {scheme: proxy URL}, read from the environment the way urlopen does
+        self.proxies = urllib.request.getproxies() if proxies is None else proxies
+        # Timing of recent requests: dicts of method, url, status, elapsed, bytes
+        self.timings = deque(maxlen=history)
+        # Callables invoked with each timing dict as a request finishes
+        self.observers = []
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _proxy_for(self, scheme, host):
+        """The proxy URL to reach host through, or None to connect directly"""
+        proxy = self.proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        return proxy if "://" in proxy else "http://" + proxy
+
+    def _connect(self, scheme, host, port, proxy, timeout):
+        if proxy is None:
+            if scheme == "https":
+                return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+            return http.client.HTTPConnection(host, port, timeout=timeout)
+        parts = urllib.parse.urlsplit(proxy)
+        proxy_port = parts.port or 8080
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(parts.hostname, proxy_port, timeout=timeout, context=self.ssl_context)
+            conn.set_tunnel(host, port, headers=proxy_auth_headers(parts))
+            return conn
+        return http.client.HTTPConnection(parts.hostname, proxy_port, timeout=timeout)
+
+    def _acquire(self, key, timeout):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._connect(*key, timeout), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+    def _read_chunk(self, conn, resp):
+        """The next bytes of the body, at most CHUNK_SIZE, without waiting past the run deadline"""
+        deadline = run_deadline.current()
+        remaining = deadline.remaining()
+        if remaining is not None:
+            deadline.check("the response body was read")
+            # The socket timeout restarts on every recv; cap it at the time left
+            if conn.sock is not None:
+                conn.sock.settimeout(min(conn.timeout, remaining) if conn.timeout else remaining)
+        # read1 returns what one recv brings instead of waiting for a full chunk;
+        # at the end, read() marks the response done so the connection can be reused
+        return resp.read1(CHUNK_SIZE) or resp.read()
+
+    def _iter_body(self, conn, resp, max_bytes, counter):
+        """Yield the body (gunzipped) chunk by chunk, refusing anything over max_bytes
+
+        Raw bytes off the wire are tallied in counter[0].
+        """
+        gzipped = (resp.getheader("Content-Encoding") or "").lower() in ("gzip", "x-gzip")
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+        length = resp.getheader("Content-Length")
+        if length and length.isdigit() and not gzipped and int(length) > max_bytes:
+            raise ResponseTooLarge(f"Response of {length} bytes exceeds limit of {max_bytes}")
+
+        size = 0
+        while True:
+            chunk = self._read_chunk(conn, resp)
+            if not chunk:
+                break
+            counter[0] += len(chunk)
+            if inflater is None:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResponseTooLarge(f"Response exceeds limit of {max_bytes} bytes")
+                yield chunk
+                continue
+            # Inflate in bounded pieces so neither a gzip bomb nor a highly
+            # compressible body lands in memory all at once
+            while chunk:
+                piece = inflater.decompress(chunk, CHUNK_SIZE)
+                chunk = inflater.unconsumed_tail
+                size += len(piece)
+                if size > max_bytes:
+                    raise ResponseTooLarge(f"Decompressed response exceeds limit of {max_bytes} bytes")
+                if piece:
+                    yield piece
+        if inflater is not None:
+            tail = inflater.flush()
+            size += len(tail)
+            if size > max_bytes:
+                raise ResponseTooLarge(f"Decompressed response exceeds limit of {max_bytes} bytes")
+            if tail:
+                yield tail
+
+    def _send(self, method, url, body, headers, timeout):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        proxy = self._proxy_for(scheme, parts.hostname)
+        key = (scheme, parts.hostname, port, proxy)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        if proxy and scheme == "http":
+            # A forwarding proxy needs the absolute URL and its own credentials
+            path = urllib.parse.urlunsplit((scheme, parts.netloc, path, "", ""))
+            headers = dict(headers, **proxy_auth_headers(urllib.parse.urlsplit(proxy)))
+
+        conn, reused = self._acquire(key, timeout)
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a fresh one
+                conn.close()
+                conn = self._connect(*key, timeout)
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+        return key, conn, resp
+
+    def _finish(self, key, conn, resp, complete):
+        # Only a fully drained response leaves the connection reusable
+        if complete and not resp.will_close:
+            self._release(key, conn)
+        else:
+            conn.close()
+
+    def _open(self, method, url, body, headers, timeout, max_bytes, counter):
+        """Send the request and follow redirects, returning the final (key, conn, resp, url)"""
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", "gzip")
+        for _ in range(MAX_REDIRECTS + 1):
+            key, conn, resp = self._send(method, url, body, headers, timeout)
+            location = resp.getheader("Location")
+            if resp.status not in (301, 302, 303, 307, 308) or not location:
+                return key, conn, resp, url
+            try:
+                for _ in self._iter_body(conn, resp, max_bytes, counter):
+                    pass
+            except BaseException:
+                conn.close()
+                raise
+            self._finish(key, conn, resp, True)
+            url = urllib.parse.urljoin(url, location)
+            if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+                headers.pop("Content-Type", None)
+        raise RuntimeError(f"Too many redirects fetching {url}")
+
+    def _record(self, method, url, status, started, received):
+        elapsed = time.perf_counter() - started
+        timing = {
+            "method": method,
+            "url": url,
+            "status": status,
+            "elapsed": elapsed,
+            "bytes": received,
+        }
+        self.timings.append(timing)
+        for observer in self.observers:
+            observer(timing)
+        return elapsed
+
+    def request(self, method, url, body=None, headers=None, timeout=15, max_bytes=None):
+        """Send a request, following redirects, and return a Response with timing"""
+        max_bytes = max_bytes or self.max_bytes
+        started = time.perf_counter()
+        counter = [0]
+        key, conn, resp, url = self._open(method, url, body, headers, timeout, max_bytes, counter)
+        try:
+            payload = b"".join(self._iter_body(conn, resp, max_bytes, counter))
+        except BaseException:
+            conn.close()
+            raise
+        self._finish(key, conn, resp, True)
+        elapsed = self._record(method, url, resp.status, started, counter[0])
+        return Response(resp.status, payload, dict(resp.getheaders()), url, elapsed, counter[0])
+
+    @contextlib.contextmanager
+    def stream(self, method, url, body=None, headers=None, timeout=15, max_bytes=None):
+        """Like request(), but the yielded Response's body is an iterator of decoded chunks
+
+        Leaving the block before the body is exhausted closes the connection
+        instead of returning it to the pool. `elapsed` and `bytes_received`
+        cover the headers only; the full figures land in `timings`.
+        """
+        max_bytes = max_bytes or self.max_bytes
+        started = time.perf_counter()
+        counter = [0]
+        key, conn, resp, url = self._open(method, url, body, headers, timeout, max_bytes, counter)
+        state = {"complete": False}
+
+        def chunks():
+            yield from self._iter_body(conn, resp, max_bytes, counter)
+            state["complete"] = True
+
+        try:
+            elapsed = time.perf_counter() - started
+            yield Response(resp.status, chunks(), dict(resp.getheaders()), url, elapsed, counter[0])
+        finally:
+            self._finish(key, conn, resp, state["complete"])
+            self._record(method, url, resp.status, started, counter[0])
+
+    def get(self, url, headers=None, timeout=15, max_bytes=None):
+        return self.request("GET", url, headers=headers, timeout=timeout, max_bytes=max_bytes)
+
+    def post(self, url, body, headers=None, timeout=20, max_bytes=None):
+        return self.request("POST", url, body=body, headers=headers, timeout=timeout, max_bytes=max_bytes)
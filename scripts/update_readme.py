@@ -1,15 +1,33 @@
 #!/usr/bin/env python3
+import io
 import os
 import re
 import json
 import sys
 import time
 import math
+import heapq
+import random
+import hashlib
+import email.utils
+import argparse
+import tempfile
+import signal
+import threading
 import datetime as dt
-import urllib.request
-import urllib.error
-import ssl
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from transport import Transport
+from rate_limit import (GraphQLScheduler, estimate_query_cost, DEFAULT_MAX_IN_FLIGHT, DEFAULT_MAX_RETRIES,
+                        DEFAULT_MAX_WAIT)
+from svg_chart import render_language_svg
+from activity_store import ActivityStore
+from state_store import StateStore, ResponseCache, cache_key, DEFAULT_CACHE_MAX_BYTES
+from replay import RecordingTransport, ReplayTransport
+from deadline import Deadline, deadline_scope, current as current_deadline
+from text_analytics import CommitTextAnalyzer, SpaceSaving
+from metrics import Metrics, submit_in_context, append_run, print_summary, DEFAULT_HISTORY as DEFAULT_METRICS_HISTORY
 
 # Load environment variables from .env file if present
 try:
@@ -19,22 +37,45 @@ except ImportError:
     # dotenv not available, continue without it
     pass
 
+CONFIG_PATH = ".github/readme.config.json"
 STATE_DIR = ".github/.state"
+# Still the key each README's state is stored under, and migrated from once
 STATE_PATH = os.path.join(STATE_DIR, "state.json")
+STATE_DB_PATH = os.path.join(STATE_DIR, "state.sqlite")
+CACHE_DIR = os.path.join(STATE_DIR, "cache")
+# Response cache and metrics: rewritten every run, never committed
+LOCAL_DB_PATH = os.path.join(CACHE_DIR, "local.sqlite")
+ACTIVITY_PATH = os.path.join(STATE_DIR, "activity.sqlite")
 DEFAULT_RSS = os.environ.get("BLOG_RSS_URL", "https://www.erinmikailstaples.com/rss/")
-GH_API_GRAPHQL = "https://api.github.com/graphql"
+# Overridable so runs can be pointed at scripts/stub_server.py
+GH_API_GRAPHQL = os.environ.get("GH_API_GRAPHQL", "https://api.github.com/graphql")
 GH_LOGIN = os.environ.get("GH_LOGIN") or os.environ.get("GITHUB_REPOSITORY_OWNER") or ""
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
 TZ = dt.timezone.utc
 
+# Shared keep-alive transport: one SSL context and connection pool per process
+TRANSPORT = Transport()
+# GraphQL response cache, set up by configure_cache(); None disables it
+RESPONSE_CACHE = None
+CACHE_TTLS = {}
+# Opened on first use by state_store(), shared by every thread
+STATE_STORE = None
+_STATE_STORE_LOCK = threading.Lock()
+# Shared GraphQL budget tracker; one per process so batch runs share the budget
+SCHEDULER = GraphQLScheduler()
+# Per-run spans: wall time, bytes, statuses, cache hits and GraphQL cost
+METRICS = Metrics()
+TRANSPORT.observers.append(METRICS.observe_http)
+
 # Marker constants
 BLOG_START = "<!-- DYNAMIC:START:blog -->"
 BLOG_END = "<!-- DYNAMIC:END:blog -->"
 STATS_START = "<!-- DYNAMIC:START:stats -->"
 STATS_END = "<!-- DYNAMIC:END:stats -->"
+# Any START/END marker, whatever the section name
+DYNAMIC_MARKER = re.compile(r"<!--\s*DYNAMIC:(START|END):([\w.-]+)\s*-->", re.IGNORECASE)
 
-def load_config():
-    cfg_path = ".github/readme.config.json"
+def load_config(cfg_path=CONFIG_PATH):
     if not os.path.isfile(cfg_path):
         return {}
     try:
@@ -43,143 +84,452 @@ def load_config():
     except Exception:
         return {}
 
-def ensure_state():
-    os.makedirs(STATE_DIR, exist_ok=True)
-    if not os.path.isfile(STATE_PATH):
-        with open(STATE_PATH, "w", encoding="utf-8") as f:
-            json.dump({}, f)
-    with open(STATE_PATH, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except Exception:
-            return {}
-
-def save_state(state):
-    os.makedirs(STATE_DIR, exist_ok=True)
-    with open(STATE_PATH, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2, sort_keys=True)
-
-def http_get(url, headers=None, timeout=15):
-    headers = headers or {}
-    req = urllib.request.Request(url, headers=headers, method="GET")
-    ctx = ssl.create_default_context()
+def merge_config(base, overrides):
+    """Return base with overrides applied, merging nested sections key by key"""
+    merged = dict(base)
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def state_store():
+    """The process-wide StateStore, opened on first use"""
+    global STATE_STORE
+    with _STATE_STORE_LOCK:
+        if STATE_STORE is None:
+            STATE_STORE = StateStore(STATE_DB_PATH, LOCAL_DB_PATH)
+        return STATE_STORE
+
+def close_state_store():
+    """Close the state store, checkpointing its write-ahead logs into the database files"""
+    global STATE_STORE, RESPONSE_CACHE
+    with _STATE_STORE_LOCK:
+        if STATE_STORE is not None:
+            STATE_STORE.close()
+            STATE_STORE = None
+            RESPONSE_CACHE = None
+
+def ensure_state(path=STATE_PATH):
+    """The state stored under `path`, migrating the JSON file at `path` on first use"""
+    return state_store().load(os.path.normpath(path), json_path=path)
+
+def write_atomic(path, text):
+    """Write text to path through a temp file and a rename, so a killed run never leaves half a file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
     try:
-        with urllib.request.urlopen(req, context=ctx, timeout=timeout) as resp:
-            body = resp.read()
-            return resp.getcode(), body, dict(resp.getheaders())
-    except urllib.error.HTTPError as e:
-        return e.code, e.read() if e.fp else b"", dict(e.headers or {})
-    except Exception as e:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; keep the mode the target already had
+        os.chmod(tmp, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
         raise
 
-def http_post(url, data_dict, headers=None, timeout=20):
-    headers = headers or {}
+def activity_store_path(state_path=STATE_PATH):
+    """The activity store kept next to a state file (batch profiles get one each)"""
+    if os.path.abspath(state_path) == os.path.abspath(STATE_PATH):
+        return ACTIVITY_PATH
+    return os.path.splitext(state_path)[0] + ".sqlite"
+
+def save_state(state, path=STATE_PATH):
+    state_store().save(os.path.normpath(path), state)
+
+def content_digest(obj):
+    """Stable SHA-256 of a JSON-able value (or a string), identical across processes"""
+    if not isinstance(obj, str):
+        obj = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(obj.encode("utf-8")).hexdigest()
+
+def state_fingerprint(state):
+    """Digest of the state that matters between runs
+
+    The commit history's fetch clock and its short-lived minute buckets move
+    on every run; on their own they are not worth writing to the state store.
+    """
+    history = dict(state.get("commit_history") or {})
+    history.pop("fetched_at", None)
+    history.pop("minutes", None)
+    return content_digest(dict(state, commit_history=history))
+
+def use_transport(transport):
+    """Swap the process-wide transport, e.g. for a recording or replaying one"""
+    global TRANSPORT
+    transport.observers.append(METRICS.observe_http)
+    previous, TRANSPORT = TRANSPORT, transport
+    previous.close()
+
+def configure_transport(args):
+    if args.record:
+        use_transport(RecordingTransport(args.record))
+    elif args.replay:
+        use_transport(ReplayTransport(args.replay, latency=args.replay_latency, jitter=args.replay_jitter,
+                                      error_rate=args.replay_error_rate, error_status=args.replay_error_status,
+                                      seed=args.replay_seed))
+
+# Every HTTP call takes its timeout from what is left of the run deadline
+def http_get(url, headers=None, timeout=15, max_bytes=None):
+    timeout = current_deadline().timeout(timeout, what=f"GET {url}")
+    resp = TRANSPORT.get(url, headers=headers, timeout=timeout, max_bytes=max_bytes)
+    return resp.status, resp.body, resp.headers
+
+def http_post(url, data_dict, headers=None, timeout=20, max_bytes=None):
+    timeout = current_deadline().timeout(timeout, what=f"POST {url}")
     data = json.dumps(data_dict).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-    ctx = ssl.create_default_context()
-    with urllib.request.urlopen(req, context=ctx, timeout=timeout) as resp:
-        body = resp.read()
-        return resp.getcode(), body, dict(resp.getheaders())
-
-def parse_rss_or_atom(xml_bytes):
-    # Attempt to parse both RSS and Atom
-    root = ET.fromstring(xml_bytes)
-    ns = {}
-    if root.tag.endswith("rss") or "rss" in root.tag:
-        channel = root.find("channel")
-        items = []
-        if channel is None:
-            return items
-        for item in channel.findall("item"):
-            title = (item.findtext("title") or "").strip()
-            link = (item.findtext("link") or "").strip()
-            pub = (item.findtext("pubDate") or "").strip()
-            items.append({"title": title, "link": link, "published": pub})
-        return items
-    # Atom
-    if root.tag.endswith("feed"):
-        # populate namespace if any
-        if root.tag[0] == "{":
-            ns_uri = root.tag[root.tag.find("{")+1:root.tag.find("}")]
-            ns = {"a": ns_uri}
-        entries = root.findall("a:entry", ns) if ns else root.findall("entry")
-        items = []
-        for e in entries:
-            title_el = e.find("a:title", ns) if ns else e.find("title")
-            title = (title_el.text if title_el is not None else "").strip()
-            link_el = e.find("a:link", ns) if ns else e.find("link")
-            link = ""
-            if link_el is not None:
-                link = link_el.get("href", "").strip() or (link_el.text or "").strip()
-            pub_el = e.find("a:updated", ns) if ns else e.find("updated")
-            if pub_el is None:
-                pub_el = e.find("a:published", ns) if ns else e.find("published")
-            pub = (pub_el.text if pub_el is not None else "").strip()
-            items.append({"title": title, "link": link, "published": pub})
-        return items
-    # Unknown format
-    return []
-
-def fmt_date(s, fallback_fmt="%b %d, %Y"):
-    # Try a few common formats, then fallback to raw string
-    for fmt in ("%a, %d %b %Y %H:%M:%S %Z", "%a, %d %b %Y %H:%M:%S %z", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S%z"):
-        try:
-            d = dt.datetime.strptime(s, fmt)
-            return d.strftime(fallback_fmt)
-        except Exception:
+    resp = TRANSPORT.post(url, data, headers=headers, timeout=timeout, max_bytes=max_bytes)
+    return resp.status, resp.body, resp.headers
+
+def http_get_stream(url, headers=None, timeout=15, max_bytes=None):
+    """Context manager yielding a Response whose body is an iterator of byte chunks"""
+    timeout = current_deadline().timeout(timeout, what=f"GET {url}")
+    return TRANSPORT.stream("GET", url, headers=headers, timeout=timeout, max_bytes=max_bytes)
+
+class ChunkReader(io.RawIOBase):
+    """Minimal file object over an iterator of byte chunks, for ET.iterparse"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buf = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            try:
+                self._buf = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+def read_rss_item(item):
+    title = (item.findtext("title") or "").strip()
+    link = (item.findtext("link") or "").strip()
+    pub = (item.findtext("pubDate") or "").strip()
+    guid = (item.findtext("guid") or "").strip() or link
+    return {"title": title, "link": link, "published": pub, "id": guid}
+
+def read_atom_entry(entry, ns):
+    title_el = entry.find(ns + "title")
+    title = (title_el.text if title_el is not None else "").strip()
+    link_el = entry.find(ns + "link")
+    link = ""
+    if link_el is not None:
+        link = link_el.get("href", "").strip() or (link_el.text or "").strip()
+    pub_el = entry.find(ns + "updated")
+    if pub_el is None:
+        pub_el = entry.find(ns + "published")
+    pub = ((pub_el.text or "") if pub_el is not None else "").strip()
+    entry_id = (entry.findtext(ns + "id") or "").strip() or link
+    return {"title": title, "link": link, "published": pub, "id": entry_id}
+
+def parse_rss_or_atom(source, max_items=None):
+    """Stream-parse an RSS or Atom feed, stopping after max_items valid entries
+
+    `source` is the feed as bytes or as an iterable of byte chunks. Entries
+    without a title or link are skipped, and every entry is detached from the
+    tree once read, so memory does not grow with the feed.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        stream = io.BytesIO(source)
+    else:
+        stream = ChunkReader(source)
+
+    items = []
+    stack = []
+    kind = None
+    ns = ""
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if not stack:
+                # Root element decides the format
+                if elem.tag.endswith("rss") or "rss" in elem.tag:
+                    kind = "rss"
+                elif elem.tag.endswith("feed"):
+                    kind = "atom"
+                    if elem.tag[0] == "{":
+                        ns = elem.tag[:elem.tag.find("}") + 1]
+                else:
+                    # Unknown format
+                    return []
+            stack.append(elem)
             continue
-    # If there's a timezone-less RFC822-like date, try without %z
-    for fmt in ("%a, %d %b %Y %H:%M:%S",):
-        try:
-            d = dt.datetime.strptime(s, fmt)
-            return d.strftime(fallback_fmt)
-        except Exception:
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if kind == "rss" and elem.tag == "item" and parent is not None and parent.tag == "channel":
+            item = read_rss_item(elem)
+        elif kind == "atom" and elem.tag == ns + "entry" and parent is not None and len(stack) == 1:
+            item = read_atom_entry(elem, ns)
+        else:
             continue
-    return s
+        elem.clear()
+        parent.remove(elem)
+        if item["title"] and item["link"]:
+            items.append(item)
+            if max_items is not None and len(items) >= max_items:
+                break
+    return items
 
-def fetch_blog_posts(rss_url, max_items, state):
+def parse_published(s):
+    """Parse a feed date once into an aware datetime, or None if it is not a date"""
+    s = (s or "").strip()
+    if not s:
+        return None
+    try:
+        # ISO 8601 (Atom, and what we store in state)
+        d = dt.datetime.fromisoformat(s[:-1] + "+00:00" if s.endswith("Z") else s)
+    except ValueError:
+        try:
+            # RFC 822 (RSS pubDate)
+            d = email.utils.parsedate_to_datetime(s)
+        except (TypeError, ValueError):
+            return None
+    if d is None:
+        return None
+    return d if d.tzinfo else d.replace(tzinfo=TZ)
+
+def normalize_post(post):
+    """Attach `published_at` and store `published` as ISO so later runs skip re-parsing"""
+    published_at = parse_published(post.get("published"))
+    post = dict(post, published_at=published_at)
+    if published_at is not None:
+        post["published"] = published_at.isoformat()
+    return post
+
+def feed_urls(blog_cfg):
+    """Feeds from the blog config: `feeds` (or a list-valued `rss_url`), else the default"""
+    feeds = blog_cfg.get("feeds") or blog_cfg.get("rss_url") or DEFAULT_RSS
+    if isinstance(feeds, str):
+        feeds = [feeds]
+    urls = []
+    for feed in feeds:
+        url = feed.get("url", "") if isinstance(feed, dict) else feed
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+def fetch_feed(rss_url, max_items, feed_state):
+    """Fetch one feed, keeping its validators, seen ids and top posts in feed_state"""
     headers = {
         "User-Agent": "Mozilla/5.0 (compatible; GitHubActionsBot; +https://github.com/erinmikailstaples/erinmikailstaples)",
         "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8"
     }
-    etag = state.get("rss_etag")
-    last_mod = state.get("rss_last_modified")
-    if etag:
-        headers["If-None-Match"] = etag
-    if last_mod:
-        headers["If-Modified-Since"] = last_mod
-
-    code, body, resp_headers = http_get(rss_url, headers=headers, timeout=15)
-    if code == 304:
-        return {"unchanged": True, "posts": []}
-    if code != 200:
-        raise RuntimeError(f"RSS fetch failed: HTTP {code}")
-
-    # Update conditional headers in state
-    if "ETag" in resp_headers:
-        state["rss_etag"] = resp_headers["ETag"]
-    if "Last-Modified" in resp_headers:
-        state["rss_last_modified"] = resp_headers["Last-Modified"]
-
-    items = parse_rss_or_atom(body)
-    # Filter invalid entries
-    items = [i for i in items if i.get("title") and i.get("link")]
-    posts = items[:max_items]
+    # Validators are only useful if we still have the posts they vouch for
+    if "posts" in feed_state:
+        etag = feed_state.get("etag")
+        last_mod = feed_state.get("last_modified")
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_mod:
+            headers["If-Modified-Since"] = last_mod
+
+    with METRICS.span("feed", url=rss_url), http_get_stream(rss_url, headers=headers, timeout=15) as resp:
+        if resp.status == 304:
+            return {"unchanged": True, "posts": feed_state.get("posts", [])}
+        if resp.status != 200:
+            raise RuntimeError(f"RSS fetch failed: HTTP {resp.status}")
+
+        # Only the top max_items entries are parsed; the rest of the body is never read
+        with METRICS.span("parse"):
+            posts = parse_rss_or_atom(resp.body, max_items=max_items)
+
+        # Update conditional headers in state
+        if "ETag" in resp.headers:
+            feed_state["etag"] = resp.headers["ETag"]
+        if "Last-Modified" in resp.headers:
+            feed_state["last_modified"] = resp.headers["Last-Modified"]
+
+    # Servers that ignore If-None-Match still serve the same top entries
+    seen = [p["id"] for p in posts]
+    if seen == feed_state.get("seen") and "posts" in feed_state:
+        return {"unchanged": True, "posts": feed_state["posts"]}
+    posts = [normalize_post(p) for p in posts]
+    feed_state["seen"] = seen
+    feed_state["posts"] = [{k: v for k, v in p.items() if k != "published_at"} for p in posts]
     return {"unchanged": False, "posts": posts}
 
-def gh_graphql(query, variables, token):
+def merge_posts(post_lists, max_items):
+    """k-way merge of per-feed post lists into the newest max_items, dropping duplicate links"""
+    oldest = dt.datetime.min.replace(tzinfo=TZ)
+
+    def newest_first(posts):
+        posts = [p if "published_at" in p else normalize_post(p) for p in posts]
+        return sorted(posts, key=lambda p: p["published_at"] or oldest, reverse=True)
+
+    merged = []
+    links = set()
+    streams = [newest_first(posts) for posts in post_lists]
+    for post in heapq.merge(*streams, key=lambda p: p["published_at"] or oldest, reverse=True):
+        if post["link"] in links:
+            continue
+        links.add(post["link"])
+        merged.append(post)
+        if len(merged) >= max_items:
+            break
+    return merged
+
+def fetch_blog_posts(rss_urls, max_items, state):
+    """Fetch every configured feed concurrently and merge them into one list"""
+    if isinstance(rss_urls, str):
+        rss_urls = [rss_urls]
+    # Keys from the old single-feed layout; they carry no posts, so start fresh
+    for old_key in ("rss_etag", "rss_last_modified", "rss_seen"):
+        state.pop(old_key, None)
+    feeds_state = state.setdefault("feeds", {})
+    for url in list(feeds_state):
+        if url not in rss_urls:
+            del feeds_state[url]
+    for url in rss_urls:
+        feeds_state.setdefault(url, {})
+
+    providers = {url: (lambda url=url: fetch_feed(url, max_items, feeds_state[url])) for url in rss_urls}
+    results, errors = run_fetch_stage(providers)
+    for url, err in errors.items():
+        print(f"[warn] Feed {url} failed: {err}", file=sys.stderr)
+    if not results:
+        message = "; ".join(str(e) for e in errors.values()) or "no feeds configured"
+        # Still a timeout when every feed ran out of time, so the caller can fall back
+        if errors and all(isinstance(e, TimeoutError) for e in errors.values()):
+            raise TimeoutError(message)
+        raise RuntimeError(message)
+
+    # A failed feed contributes its last good posts
+    post_lists = [results[url]["posts"] if url in results else feeds_state[url].get("posts", []) for url in rss_urls]
+    with METRICS.span("aggregate"):
+        posts = merge_posts(post_lists, max_items)
+    return {"unchanged": all(r.get("unchanged") for r in results.values()), "posts": posts}
+
+def configure_cache(cfg, enabled=True):
+    """Set up the shared GraphQL response cache from the "cache" config section"""
+    global RESPONSE_CACHE, CACHE_TTLS
+    cache_cfg = (cfg.get("cache") or {})
+    CACHE_TTLS = {name: float(ttl) for name, ttl in (cache_cfg.get("ttl") or {}).items()}
+    if not enabled:
+        RESPONSE_CACHE = None
+        return None
+    RESPONSE_CACHE = ResponseCache(state_store(),
+                                   max_bytes=int(cache_cfg.get("max_bytes", DEFAULT_CACHE_MAX_BYTES)))
+    return RESPONSE_CACHE
+
+def cache_ttl(sections):
+    # A response shared by several sections is only as fresh as the strictest one
+    ttls = [CACHE_TTLS.get(name, 0) for name in sections]
+    return min(ttls) if ttls else 0
+
+def configure_scheduler(cfg):
+    """Set up the shared rate-limit scheduler from the "graphql" config section"""
+    global SCHEDULER
+    gql_cfg = (cfg.get("graphql") or {})
+    SCHEDULER = GraphQLScheduler(
+        max_in_flight=int(gql_cfg.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT)),
+        max_retries=int(gql_cfg.get("max_retries", DEFAULT_MAX_RETRIES)),
+        max_wait=float(gql_cfg.get("max_rate_limit_wait", DEFAULT_MAX_WAIT)),
+    )
+    return SCHEDULER
+
+def with_rate_limit(query):
+    """Ask for the query's cost and the remaining budget alongside its data"""
+    brace = query.index("{")
+    return query[:brace + 1] + "\n  rateLimit { cost remaining resetAt limit }" + query[brace + 1:]
+
+def gh_graphql(query, variables, token, sections=()):
+    cache = RESPONSE_CACHE
+    ttl = cache_ttl(sections)
+    key = None
+    if cache is not None and ttl > 0:
+        key = cache_key(query, variables)
+        cached = cache.get(key, ttl)
+        if cached is not None:
+            METRICS.add(cache_hits=1)
+            return cached
+        METRICS.add(cache_misses=1)
+
     headers = {
         "Content-Type": "application/json",
         "User-Agent": "GitHubActionsBot",
         "Authorization": f"bearer {token}"
     }
-    code, body, _ = http_post(GH_API_GRAPHQL, {"query": query, "variables": variables}, headers=headers, timeout=25)
+    payload = {"query": with_rate_limit(query), "variables": variables}
+    cost = estimate_query_cost(query, variables)
+    # One write per line, so concurrent queries do not interleave their logs
+    sys.stderr.write(f"[graphql] {'+'.join(sections) or 'query'}: estimated cost {cost}\n")
+    code, body, _ = SCHEDULER.execute(
+        lambda: http_post(GH_API_GRAPHQL, payload, headers=headers, timeout=25), cost)
     if code != 200:
         raise RuntimeError(f"GraphQL HTTP {code}: {body.decode('utf-8', errors='ignore')}")
     data = json.loads(body.decode("utf-8"))
     if "errors" in data and data["errors"]:
         raise RuntimeError(f"GraphQL errors: {data['errors']}")
-    return data["data"]
+    result = data["data"]
+    rate_limit = result.pop("rateLimit", None)
+    SCHEDULER.observe_rate_limit(rate_limit)
+    METRICS.add(graphql_cost=int((rate_limit or {}).get("cost") or 0), graphql_estimated_cost=cost)
+    if key is not None:
+        cache.put(key, result, sections)
+    return result
+
+# Connection paging defaults; overridable via the "graphql" config section
+GRAPHQL_PAGE_SIZE = 50
+GRAPHQL_MAX_PAGES = 10
+
+def paging_options(cfg):
+    gql_cfg = (cfg.get("graphql") or {})
+    return {
+        "page_size": max(1, min(100, int(gql_cfg.get("page_size", GRAPHQL_PAGE_SIZE)))),
+        "max_pages": max(1, int(gql_cfg.get("max_pages", GRAPHQL_MAX_PAGES))),
+    }
+
+def gh_graphql_pages(query, variables, token, path, first_page=None, sections=(),
+                     page_size=GRAPHQL_PAGE_SIZE, max_pages=GRAPHQL_MAX_PAGES):
+    """Yield the nodes (or edges) of the connection at `path`, following pageInfo.endCursor
+
+    `first_page` is a connection that was already fetched (e.g. by the batched
+    user query); later pages are only requested as the caller iterates. The
+    query must accept `$first` and `$after`. Without a token only the first
+    page is yielded.
+    """
+    conn = first_page
+    after = None
+    pages = 0
+    while True:
+        if conn is None:
+            data = gh_graphql(query, dict(variables, first=page_size, after=after), token, sections=sections)
+            conn = data
+            for key in path:
+                conn = (conn or {}).get(key)
+            conn = conn or {}
+        pages += 1
+        if "edges" in conn:
+            yield from conn.get("edges") or []
+        else:
+            yield from conn.get("nodes") or []
+
+        info = conn.get("pageInfo") or {}
+        if not info.get("hasNextPage") or not token:
+            return
+        if pages >= max_pages:
+            print(f"[warn] Stopped paging {'.'.join(path)} after {max_pages} pages", file=sys.stderr)
+            return
+        after = info.get("endCursor")
+        conn = None
+        current_deadline().check(f"page {pages + 1} of {'.'.join(path)}")
+
+def repo_query_vars(name_with_owner):
+    owner, _, name = name_with_owner.partition("/")
+    return {"owner": owner, "name": name}
 
 def start_of_year(now):
     return dt.datetime(now.year, 1, 1, tzinfo=TZ)
@@ -187,134 +537,427 @@ def start_of_year(now):
 def isoformat(d):
     return d.astimezone(TZ).isoformat()
 
-def fetch_github_stats(login, token, recent_days_window=90):
-    now = dt.datetime.now(TZ)
-    from_year = start_of_year(now)
-    from_recent = now - dt.timedelta(days=recent_days_window)
-
-    query = """
-    query($login:String!, $fromYear:DateTime!, $to:DateTime!) {
-      user(login: $login) {
-        contributionsCollection(from: $fromYear, to: $to) {
-          totalCommitContributions
+# Selections below are composed under one aliased `user(login:)` root so that
+# every section shares a single GraphQL round trip. Each is assembled by
+# query_plan() from only the fields the config renders.
+#
+# The stats part is a sync window for the activity store: daily commit buckets
+# per repo from $syncFrom to the end of today. Restricted (private) commits are
+# only reported as a total, so the year-to-date count comes from a second,
+# field-only collection. Both are templates over the names of their range
+# variables, as the history windows of past years reuse them.
+STATS_PRIVATE_FIELDS = """
+        ytd: contributionsCollection(from: $%(from)s, to: $%(to)s) {
           restrictedContributionsCount
+        }
+"""
+STATS_WINDOW_FIELDS = """
+        contributionsCollection(from: $%(from)s, to: $%(to)s) {
+          # A plain list capped at 100 by the API; it has no cursor to follow
           commitContributionsByRepository(maxRepositories: 100) {
             repository {
               nameWithOwner
-              isPrivate
-              isFork
-              stargazerCount
-              primaryLanguage { name }
-              languages(first: 10, orderBy: {field: SIZE, direction: DESC}) {
-                edges { size node { name } }
+              # Languages and topics come from fetch_repo_details(), only for repos pushed since last time
+              pushedAt%(repository)s
+            }
+            # One node per day with commits; a sync window never spans more days than fit on this page
+            contributions(first: 100) {
+              totalCount
+              nodes { occurredAt commitCount }
+            }
+          }
+        }
+"""
+# Optional repository fields, keyed by the plan flag that renders them
+STATS_REPO_FIELDS = {"stars": "stargazerCount", "languages": "primaryLanguage { name }"}
+# The years with any contributions, for the lifetime history
+STATS_YEARS_FIELDS = """
+        years: contributionsCollection {
+          contributionYears
+        }
+"""
+# The newest stored day is fetched again, as it may have been partial
+ACTIVITY_SYNC_OVERLAP = dt.timedelta(days=1)
+ACTIVITY_SYNC_DAYS = 90
+# Repos need at least this many commits this year to be listed
+MIN_REPO_COMMITS = 12
+
+# Commit history is fetched incrementally: only commits `since:` the previous
+# run (minus a small overlap) are requested and folded into state.
+COMMIT_HISTORY_OVERLAP = dt.timedelta(days=1)
+COMMIT_PR_FIELDS = """
+        contributionsCollection {
+          pullRequestContributions(first: 100) {
+            totalCount
+            nodes {
+              pullRequest {
+                merged
+                createdAt
               }
-              repositoryTopics(first: 30) {
-                nodes { topic { name } }
+            }
+          }
+        }
+"""
+COMMIT_HISTORY_FIELDS = """
+        repositories(first: $pageSize, orderBy: {field: PUSHED_AT, direction: DESC}, ownerAffiliations: OWNER) {
+          pageInfo { hasNextPage endCursor }
+          nodes {
+            nameWithOwner
+            defaultBranchRef {
+              target {
+                ... on Commit {
+                  history(first: $pageSize, since: $since) {
+                    pageInfo { hasNextPage endCursor }
+                    nodes {
+                      oid
+                      message
+                      committedDate
+                    }
+                  }
+                }
               }
-              pushedAt
             }
-            contributions {
-              totalCount
+          }
+        }
+"""
+
+# Per-repo language bytes and topics, requested for several repos at once
+# under aliases r0, r1, ... by compose_repo_details_query()
+REPO_DETAILS_FIELDS = {
+    "languages": """
+    languages(first: $pageSize, orderBy: {field: SIZE, direction: DESC}) {
+      totalSize
+      pageInfo { hasNextPage endCursor }
+      edges { size node { name } }
+    }
+""",
+    "topics": """
+    repositoryTopics(first: $pageSize) {
+      pageInfo { hasNextPage endCursor }
+      nodes { topic { name } }
+    }
+""",
+}
+REPO_DETAILS_BATCH = 20
+
+# Follow-up queries for connections that did not fit in the first page
+REPO_LANGUAGES_QUERY = """
+query($owner:String!, $name:String!, $first:Int!, $after:String) {
+  repository(owner: $owner, name: $name) {
+    languages(first: $first, after: $after, orderBy: {field: SIZE, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      edges { size node { name } }
+    }
+  }
+}
+"""
+
+REPO_TOPICS_QUERY = """
+query($owner:String!, $name:String!, $first:Int!, $after:String) {
+  repository(owner: $owner, name: $name) {
+    repositoryTopics(first: $first, after: $after) {
+      pageInfo { hasNextPage endCursor }
+      nodes { topic { name } }
+    }
+  }
+}
+"""
+
+OWNED_REPOS_QUERY = """
+query($login:String!, $since:GitTimestamp, $first:Int!, $after:String) {
+  user(login: $login) {
+    repositories(first: $first, after: $after, orderBy: {field: PUSHED_AT, direction: DESC}, ownerAffiliations: OWNER) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        nameWithOwner
+        defaultBranchRef {
+          target {
+            ... on Commit {
+              history(first: $first, since: $since) {
+                pageInfo { hasNextPage endCursor }
+                nodes { oid message committedDate }
+              }
             }
           }
         }
       }
     }
+  }
+}
+"""
+
+REPO_HISTORY_QUERY = """
+query($owner:String!, $name:String!, $since:GitTimestamp, $first:Int!, $after:String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first, after: $after, since: $since) {
+            pageInfo { hasNextPage endCursor }
+            nodes { oid message committedDate }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Everything the config can switch off, and the config that does it
+PLAN_FLAGS = ("private", "stars", "languages", "topics", "commit_facts", "pr_facts", "history")
+
+def query_plan(cfg):
+    """Which optional GitHub fields the config renders, as {flag: bool}
+
+    A field whose output is turned off (or limited to 0 items) is never
+    requested: no restricted count without show_private_summary, no stars
+    without the repo table (max_repositories), no languages or topics with
+    max_languages or max_frameworks at 0, no commit history without
+    commit_facts, no pull requests without pr_facts and no contribution years
+    without history_years.
     """
+    stats_cfg = cfg.get("stats") or {}
+    return {
+        "private": bool(stats_cfg.get("show_private_summary", True)),
+        "stars": int(stats_cfg.get("max_repositories", 8)) > 0,
+        "languages": int(stats_cfg.get("max_languages", 6)) > 0,
+        "topics": int(stats_cfg.get("max_frameworks", 6)) > 0,
+        "commit_facts": bool(stats_cfg.get("commit_facts", True)),
+        "pr_facts": bool(stats_cfg.get("commit_facts", True)) and bool(stats_cfg.get("pr_facts", True)),
+        "history": bool(stats_cfg.get("history_years", 0)),
+    }
+
+FULL_PLAN = dict.fromkeys(PLAN_FLAGS, True)
+
+def stats_query_part(plan):
+    """(variable declarations, selection) of the stats sync window under `plan`"""
+    decls = {"syncFrom": "DateTime!", "to": "DateTime!"}
+    fields = ""
+    if plan["private"]:
+        decls["fromYear"] = "DateTime!"
+        fields += STATS_PRIVATE_FIELDS % {"from": "fromYear", "to": "to"}
+    if plan["history"]:
+        fields += STATS_YEARS_FIELDS
+    return decls, fields + stats_window_fields(plan, "syncFrom", "to")
+
+def stats_window_fields(plan, from_var, to_var):
+    repository = "".join(f"\n              {field}" for flag, field in STATS_REPO_FIELDS.items() if plan[flag])
+    return STATS_WINDOW_FIELDS % {"from": from_var, "to": to_var, "repository": repository}
+
+def commit_query_part(plan):
+    fields = (COMMIT_PR_FIELDS if plan["pr_facts"] else "") + COMMIT_HISTORY_FIELDS
+    return {"since": "GitTimestamp", "pageSize": "Int!"}, fields
+
+# Sections served by the batched user query, in query order
+GITHUB_QUERY_PARTS = {
+    "stats": stats_query_part,
+    "commit_analysis": commit_query_part,
+}
+GITHUB_SECTIONS = tuple(GITHUB_QUERY_PARTS)
+
+def planned_sections(plan):
+    """The GitHub sections worth fetching at all under `plan`"""
+    return tuple(name for name in GITHUB_SECTIONS if name != "commit_analysis" or plan["commit_facts"])
+
+def compose_user_query(parts):
+    """Merge (alias, variable declarations, selection) parts into one aliased user query"""
+    var_decls = {"login": "String!"}
+    for _, decls, _ in parts:
+        for name, kind in decls.items():
+            if var_decls.setdefault(name, kind) != kind:
+                raise ValueError(f"Conflicting GraphQL variable ${name}: {var_decls[name]} vs {kind}")
+    header = ", ".join(f"${name}:{kind}" for name, kind in var_decls.items())
+    body = "".join(
+        f"      {alias}: user(login: $login) {{{selection}      }}\n" for alias, _, selection in parts
+    )
+    return f"query({header}) {{\n{body}    }}"
+
+def end_of_day(day):
+    return dt.datetime(day.year, day.month, day.day, 23, 59, 59, tzinfo=TZ)
+
+def activity_sync_windows(synced_through, now):
+    """(first, last) dates still to sync into the activity store, newest first
+
+    An empty store is filled from the start of the year; after that only the
+    days from the last one synced onwards are requested. Each window spans at
+    most ACTIVITY_SYNC_DAYS days, so one page of daily nodes always covers it.
+    """
+    today = now.astimezone(TZ).date()
+    if synced_through:
+        start = dt.date.fromisoformat(synced_through) - ACTIVITY_SYNC_OVERLAP
+    else:
+        start = start_of_year(now).date()
+    # A contributions collection may not span more than a year
+    start = max(start, today - dt.timedelta(days=364))
+    return split_windows(start, today)
+
+def split_windows(start, end):
+    """(first, last) dates covering [start, end] in ACTIVITY_SYNC_DAYS-day windows, newest first"""
+    windows = []
+    while end >= start:
+        first = max(start, end - dt.timedelta(days=ACTIVITY_SYNC_DAYS - 1))
+        windows.append((first, end))
+        end = first - dt.timedelta(days=1)
+    return windows
 
+def start_of_day(day):
+    return dt.datetime(day.year, day.month, day.day, tzinfo=TZ)
+
+def stats_query_variables(now, window, plan=FULL_PLAN):
+    first, last = window
     variables = {
-        "login": login,
-        "fromYear": isoformat(from_year),
-        "to": isoformat(now)
+        # Whole days rather than "now" keep the variables (and so the cache
+        # key) stable for the rest of the day
+        "syncFrom": isoformat(start_of_day(first)),
+        "to": isoformat(end_of_day(last)),
     }
-    data = gh_graphql(query, variables, token)
-    cc = data["user"]["contributionsCollection"]
-    total_commits = cc.get("totalCommitContributions", 0)
-    restricted = cc.get("restrictedContributionsCount", 0)
+    if plan["private"]:
+        variables["fromYear"] = isoformat(start_of_year(now))
+    return variables
 
-    # Aggregate languages and frameworks for repos with recent contributions
-    langs_weight = {}
-    frameworks_weight = {}
-    recent_repos = []  # Track recent repositories
-
-    # Simple framework keyword map (topics to display names)
-    FRAME_KEYS = {
-        "react": "React",
-        "nextjs": "Next.js",
-        "next-js": "Next.js",
-        "astro": "Astro",
-        "svelte": "Svelte",
-        "vue": "Vue",
-        "nuxt": "Nuxt",
-        "angular": "Angular",
-        "express": "Express",
-        "nodejs": "Node.js",
-        "django": "Django",
-        "flask": "Flask",
-        "fastapi": "FastAPI",
-        "rails": "Rails",
-        "laravel": "Laravel",
-        "spring": "Spring",
-        "tensorflow": "TensorFlow",
-        "pytorch": "PyTorch",
-        "tailwind": "Tailwind CSS",
-        "bootstrap": "Bootstrap"
-    }
+def history_span(setting, contribution_years, now):
+    """Past years the lifetime history covers, newest first
 
-    for item in cc.get("commitContributionsByRepository", []):
-        repo = item.get("repository") or {}
-        contribs = (item.get("contributions") or {}).get("totalCount", 0)
-        if contribs <= 0:
-            continue
+    `setting` is stats.history_years: "all" for every year GitHub lists in
+    contributionYears, or N for the last N calendar years, this one included.
+    The current year always comes from the regular sync.
+    """
+    this_year = now.astimezone(TZ).year
+    years = set(contribution_years or ())
+    if setting != "all":
+        recent = set(range(this_year - int(setting) + 1, this_year))
+        years = years & recent if years else recent
+    return sorted((year for year in years if year < this_year), reverse=True)
 
-        # Filter to recently active repos (stricter criteria)
-        pushed_at = repo.get("pushedAt")
-        is_recent = True
-        try:
-            if pushed_at:
-                # 2025-10-18T16:58:12Z
-                pushed_dt = dt.datetime.strptime(pushed_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=TZ)
-                is_recent = pushed_dt >= dt.datetime.now(TZ) - dt.timedelta(days=60)  # 60 days instead of 90
-        except Exception:
-            pass
-        if not is_recent:
-            continue
+def history_query(year, plan):
+    """(query, variables) covering all of a past `year` in one request
 
-        # Include repos with meaningful activity (lower threshold for 5 repos)
-        repo_name = repo.get("nameWithOwner", "")
-        repo_stars = repo.get("stargazerCount", 0)
-        if repo_name and contribs >= 12:  # Lowered to 12 to get ~5 repos
-            recent_repos.append({
-                "name": repo_name,
-                "commits": contribs,
-                "stars": repo_stars
-            })
-
-        langs = (repo.get("languages") or {}).get("edges", [])
-        total_size = sum(edge.get("size", 0) for edge in langs) or 1
-        for edge in langs:
-            name = ((edge.get("node") or {}).get("name") or "").strip()
-            size = edge.get("size", 0)
-            if not name:
+    A contributions collection holds one page of daily nodes, so the year is
+    split into sync windows, each its own aliased part (w0 is the newest).
+    The first also carries the year's restricted count.
+    """
+    windows = split_windows(dt.date(year, 1, 1), dt.date(year, 12, 31))
+    parts = []
+    variables = {}
+    for i, (first, last) in enumerate(windows):
+        decls = {f"from{i}": "DateTime!", f"to{i}": "DateTime!"}
+        variables.update({f"from{i}": isoformat(start_of_day(first)), f"to{i}": isoformat(end_of_day(last))})
+        fields = stats_window_fields(plan, f"from{i}", f"to{i}")
+        if i == 0 and plan["private"]:
+            decls["fromYear"] = "DateTime!"
+            variables["fromYear"] = isoformat(start_of_day(dt.date(year, 1, 1)))
+            fields = STATS_PRIVATE_FIELDS % {"from": "fromYear", "to": "to0"} + fields
+        parts.append((f"w{i}", decls, fields))
+    return compose_user_query(parts), variables
+
+def detail_fields(plan):
+    """The per-repo connections fetch_repo_details() requests under `plan`"""
+    return [flag for flag in REPO_DETAILS_FIELDS if plan[flag]]
+
+def compose_repo_details_query(count, fields=tuple(REPO_DETAILS_FIELDS)):
+    selection = "\n    nameWithOwner\n    pushedAt" + ("".join(REPO_DETAILS_FIELDS[field] for field in fields) or "\n")
+    decls = ", ".join((["$pageSize:Int!"] if fields else [])
+                      + [f"$owner{i}:String!, $name{i}:String!" for i in range(count)])
+    body = "".join(f"  r{i}: repository(owner: $owner{i}, name: $name{i}) {{{selection}  }}\n"
+                   for i in range(count))
+    return f"query({decls}) {{\n{body}}}"
+
+def repo_details(name, pushed_at, langs_conn, topics_conn, token=None, paging=None):
+    """Flatten a repo's language and topic connections (following further pages) for the cache"""
+    paging = paging or paging_options({})
+    token = token if name else None
+    langs = gh_graphql_pages(REPO_LANGUAGES_QUERY, repo_query_vars(name), token, ("repository", "languages"),
+                             first_page=langs_conn or {}, sections=("stats",), **paging)
+    languages = [[(edge.get("node") or {}).get("name") or "", edge.get("size", 0)] for edge in langs]
+    topic_nodes = gh_graphql_pages(REPO_TOPICS_QUERY, repo_query_vars(name), token, ("repository", "repositoryTopics"),
+                                   first_page=topics_conn or {}, sections=("stats",), **paging)
+    return {
+        "pushedAt": pushed_at,
+        "total_size": (langs_conn or {}).get("totalSize") or sum(size for _, size in languages),
+        "languages": languages,
+        "topics": [(n.get("topic") or {}).get("name", "") for n in topic_nodes],
+    }
+
+def fetch_repo_details(repos, token, paging=None, cache=None, fields=tuple(REPO_DETAILS_FIELDS)):
+    """Return {nameWithOwner: details} for repos, a list of (nameWithOwner, pushedAt)
+
+    Entries in `cache` whose pushedAt still matches, and that hold every one
+    of `fields` ("languages", "topics"), are reused. Only the rest are
+    requested, REPO_DETAILS_BATCH repos per aliased query. Without any
+    fields nothing is fetched.
+    """
+    paging = paging or paging_options({})
+    cache = cache or {}
+    fields = list(fields)
+    details = {}
+    stale = []
+    for name, pushed_at in repos:
+        cached = cache.get(name)
+        # Entries cached before fields were planned hold both
+        cached_fields = (cached or {}).get("fields", list(REPO_DETAILS_FIELDS))
+        if cached and cached.get("pushedAt") == pushed_at and set(fields) <= set(cached_fields):
+            details[name] = cached
+        else:
+            stale.append((name, pushed_at))
+    if not token or not fields:
+        return details
+    for start in range(0, len(stale), REPO_DETAILS_BATCH):
+        chunk = stale[start:start + REPO_DETAILS_BATCH]
+        variables = {"pageSize": paging["page_size"]}
+        for i, (name, _) in enumerate(chunk):
+            parts = repo_query_vars(name)
+            variables[f"owner{i}"] = parts["owner"]
+            variables[f"name{i}"] = parts["name"]
+        data = gh_graphql(compose_repo_details_query(len(chunk), fields), variables, token, sections=("stats",))
+        for i, (name, pushed_at) in enumerate(chunk):
+            node = data.get(f"r{i}")
+            if node is None:
+                # Deleted or no longer visible; aggregate without its languages
                 continue
-            # Weight language by both repo composition and your commits in that repo
-            weight = (size / total_size) * contribs
-            langs_weight[name] = langs_weight.get(name, 0.0) + weight
+            details[name] = repo_details(name, node.get("pushedAt") or pushed_at, node.get("languages"),
+                                         node.get("repositoryTopics"), token=token, paging=paging)
+            details[name]["fields"] = fields
+    return details
+
+# Simple framework keyword map (topics to display names)
+FRAME_KEYS = {
+    "react": "React",
+    "nextjs": "Next.js",
+    "next-js": "Next.js",
+    "astro": "Astro",
+    "svelte": "Svelte",
+    "vue": "Vue",
+    "nuxt": "Nuxt",
+    "angular": "Angular",
+    "express": "Express",
+    "nodejs": "Node.js",
+    "django": "Django",
+    "flask": "Flask",
+    "fastapi": "FastAPI",
+    "rails": "Rails",
+    "laravel": "Laravel",
+    "spring": "Spring",
+    "tensorflow": "TensorFlow",
+    "pytorch": "PyTorch",
+    "tailwind": "Tailwind CSS",
+    "bootstrap": "Bootstrap"
+}
 
-        topics = [(n.get("topic") or {}).get("name", "") for n in (repo.get("repositoryTopics") or {}).get("nodes", [])]
-        for t in topics:
-            key = t.lower().strip()
-            if key in FRAME_KEYS:
-                disp = FRAME_KEYS[key]
-                frameworks_weight[disp] = frameworks_weight.get(disp, 0.0) + contribs
+def add_framework_weights(frameworks_weight, topics, contribs):
+    for t in topics or []:
+        key = t.lower().strip()
+        if key in FRAME_KEYS:
+            disp = FRAME_KEYS[key]
+            frameworks_weight[disp] = frameworks_weight.get(disp, 0.0) + contribs
 
+def summarize_stats(total_commits, restricted, langs_weight, frameworks_weight, recent_repos):
     # Normalize to percentages for languages
     total_lang_weight = sum(langs_weight.values()) or 1.0
     langs_sorted = sorted(langs_weight.items(), key=lambda x: x[1], reverse=True)
     langs_pct = [(name, round((w / total_lang_weight) * 100)) for name, w in langs_sorted]
 
     frameworks_sorted = sorted(frameworks_weight.items(), key=lambda x: x[1], reverse=True)
-    
+
     # Sort repositories by commit count, then by stars
     repos_sorted = sorted(recent_repos, key=lambda x: (x["commits"], x["stars"]), reverse=True)
 
@@ -326,6 +969,272 @@ def fetch_github_stats(login, token, recent_days_window=90):
         "repositories": repos_sorted
     }
 
+def language_shares(details, primary_language=None):
+    """{language: fraction of the repo's bytes}; all of it to the primary language when unknown"""
+    languages = (details or {}).get("languages") or []
+    total_size = (details or {}).get("total_size") or 1
+    shares = {}
+    for name, size in languages:
+        name = (name or "").strip()
+        if name:
+            shares[name] = shares.get(name, 0.0) + size / total_size
+    if not shares and primary_language:
+        shares[primary_language] = 1.0
+    return shares
+
+def activity_buckets(user):
+    """Daily commit buckets {(day, nameWithOwner): commits} and repo metadata from one sync window"""
+    repo_days = {}
+    repos = {}
+    cc = user.get("contributionsCollection") or {}
+    for item in cc.get("commitContributionsByRepository") or []:
+        repo = item.get("repository") or {}
+        name = repo.get("nameWithOwner")
+        if not name:
+            continue
+        # Fields the query plan left out keep their stored values
+        meta = repos[name] = {"pushed_at": repo.get("pushedAt")}
+        if "stargazerCount" in repo:
+            meta["stars"] = repo.get("stargazerCount") or 0
+        if "primaryLanguage" in repo:
+            meta["primary_language"] = (repo.get("primaryLanguage") or {}).get("name")
+        if "isPrivate" in repo:
+            meta["is_private"] = int(bool(repo.get("isPrivate")))
+        if "isFork" in repo:
+            meta["is_fork"] = int(bool(repo.get("isFork")))
+        for node in (item.get("contributions") or {}).get("nodes") or []:
+            day = (node.get("occurredAt") or "")[:10]
+            if day:
+                repo_days[(day, name)] = repo_days.get((day, name), 0) + int(node.get("commitCount") or 0)
+    return repo_days, repos
+
+def collect_buckets(slices):
+    """activity_buckets() of several sync windows (newest first); newer windows win where they overlap"""
+    repo_days = {}
+    repos = {}
+    for user in reversed(slices):
+        days, meta = activity_buckets(user)
+        repo_days.update(days)
+        repos.update(meta)
+    return repo_days, repos
+
+def sync_activity(store, slices, token, paging=None, repo_cache=None, active_since=None,
+                  fields=tuple(REPO_DETAILS_FIELDS), through=None):
+    """Record sync-window slices (newest first) in the activity store
+
+    Languages are split by each repo's byte shares from fetch_repo_details(),
+    which also refreshes `repo_cache` (with `fields`) for the repos active
+    since `active_since`. `through`, the last day the slices cover, becomes
+    the store's sync watermark once they are recorded. Returns the number of
+    daily buckets that changed.
+    """
+    repo_days, repos = collect_buckets(slices)
+    known = store.repo_meta()
+    known.update(repos)
+    names = set(repos)
+    if active_since is not None:
+        names.update(store.repo_totals(active_since))
+    wanted = [(name, known.get(name, {}).get("pushed_at")) for name in sorted(names)]
+    details = fetch_repo_details(wanted, token, paging=paging, cache=repo_cache, fields=fields)
+    if repo_cache is not None:
+        repo_cache.clear()
+        repo_cache.update(details)
+    shares = {name: language_shares(details.get(name), meta.get("primary_language")) for name, meta in repos.items()}
+    changed = store.record(repo_days, shares, repos)
+    if through is not None:
+        store.mark_synced(through.isoformat())
+    return changed
+
+def fetch_history_year(login, token, year, plan, paging=None, repo_cache=None):
+    """Daily buckets, language shares, repo metadata and restricted count of a past year"""
+    query, variables = history_query(year, plan)
+    data = gh_graphql(query, dict(variables, login=login), token, sections=("stats",))
+    slices = [data[alias] for alias in sorted(data, key=lambda alias: int(alias[1:]))]
+    repo_days, repos = collect_buckets(slices)
+    restricted = (slices[0].get("ytd") or {}).get("restrictedContributionsCount", 0)
+    # Byte shares split the year's commits by language, as for the current year
+    wanted = [(name, meta.get("pushed_at")) for name, meta in sorted(repos.items())]
+    details = fetch_repo_details(wanted, token, paging=paging, cache=repo_cache,
+                                 fields=["languages"] if plan["languages"] else [])
+    shares = {name: language_shares(details.get(name), meta.get("primary_language")) for name, meta in repos.items()}
+    return repo_days, shares, repos, restricted
+
+def sync_history(store, login, token, years, plan, paging=None, repo_cache=None):
+    """Fetch the past `years` missing from the activity store, all at once
+
+    Each year is one query through the scheduler, so they share its budget
+    tracking and in-flight limit. Results are written from this thread once
+    all have finished; a year that fails is reported and fetched again on the
+    next run. Returns the number of daily buckets that changed.
+    """
+    stored = store.history_years()
+    providers = {}
+    for year in years:
+        if year not in stored:
+            def fetch(year=year):
+                with METRICS.span("fetch.history", year=year):
+                    return fetch_history_year(login, token, year, plan, paging=paging, repo_cache=repo_cache)
+            providers[year] = fetch
+    results, errors = run_fetch_stage(providers, max_workers=SCHEDULER.max_in_flight)
+    for year, e in sorted(errors.items()):
+        print(f"[warn] History for {year} failed: {e}", file=sys.stderr)
+    changed = 0
+    for year, (repo_days, shares, repos, restricted) in sorted(results.items()):
+        changed += store.record_year(year, repo_days, shares, repos, restricted=restricted)
+    return changed
+
+def history_stats(store, years, now, restricted=0):
+    """Lifetime totals over the current year and the past `years` (newest first) stored so far
+
+    A past year that could not be fetched yet ends the range, so the totals
+    never skip a year they claim to cover. Years without contributions are
+    not in `years` and need nothing stored. None until a past year is.
+    """
+    stored = store.history_years()
+    first = now.astimezone(TZ).year
+    for year in years:
+        if year not in stored:
+            break
+        first = year
+        restricted += stored[year] or 0
+    if first == now.astimezone(TZ).year:
+        return None
+    since = dt.date(first, 1, 1).isoformat()
+    langs = store.language_totals(since)
+    total_weight = sum(langs.values()) or 1.0
+    return {
+        "since": first,
+        "commits": store.total(since),
+        "restricted": restricted,
+        "repositories": len(store.repo_totals(since)),
+        "languages": [(name, round(w / total_weight * 100))
+                      for name, w in sorted(langs.items(), key=lambda x: x[1], reverse=True)],
+    }
+
+def stats_from_activity(store, now, restricted=0, repo_cache=None, recent_days_window=90, recent_repo_days=60):
+    """Stats for the README from range queries over the activity store
+
+    Repos with commits in the last `recent_repo_days` days are listed with
+    their year-to-date commits and weight the languages and frameworks;
+    `recent_days_window` and the last two weeks give the trend figures.
+    """
+    today = now.astimezone(TZ).date()
+    year_start = start_of_year(now).date().isoformat()
+    active_since = (today - dt.timedelta(days=recent_repo_days)).isoformat()
+
+    ytd = store.repo_totals(year_start)
+    active = store.repo_totals(active_since)
+    meta = store.repo_meta()
+
+    recent_repos = []
+    frameworks_weight = {}
+    for name in active:
+        contribs = ytd.get(name, 0)
+        if contribs >= MIN_REPO_COMMITS:
+            recent_repos.append({"name": name, "commits": contribs, "stars": (meta.get(name) or {}).get("stars") or 0})
+        add_framework_weights(frameworks_weight, ((repo_cache or {}).get(name) or {}).get("topics"), contribs)
+    langs_weight = store.language_totals(year_start, active_since=active_since)
+
+    stats = summarize_stats(store.total(year_start), restricted, langs_weight, frameworks_weight, recent_repos)
+    stats.update({
+        "recent_days": recent_days_window,
+        "recent_commits": store.total((today - dt.timedelta(days=recent_days_window - 1)).isoformat()),
+        "commits_this_week": store.total((today - dt.timedelta(days=6)).isoformat()),
+        "commits_last_week": store.total((today - dt.timedelta(days=13)).isoformat(),
+                                         (today - dt.timedelta(days=7)).isoformat()),
+    })
+    return stats
+
+def fetch_github_sections(login, token, recent_days_window=90, state=None, paging=None,
+                          sections=GITHUB_SECTIONS, activity_path=ACTIVITY_PATH, recent_repo_days=60, plan=FULL_PLAN,
+                          history_years=0):
+    """Fetch the requested GitHub sections with one batched GraphQL request
+
+    Stats sync the newest days into the activity store at `activity_path` and
+    are then computed from it; only a first sync of the year needs more than
+    the one window that rides along in the batched request. Only the fields
+    `plan` (see query_plan()) renders are requested, and sections it turns
+    off are skipped. With `history_years` ("all" or a number of years) the
+    stats also carry lifetime totals; past years are fetched once, in
+    parallel, and then served from the store. Returns {section: data} for
+    every section that succeeded; a failed commit analysis is reported and
+    left out rather than failing stats too, unless it ran out of time: then
+    the repos it read in full are kept in `state` and the TimeoutError is
+    raised, so the caller keeps its last good block, marked stale.
+    """
+    now = dt.datetime.now(TZ)
+    paging = paging or paging_options({})
+    sections = [name for name in planned_sections(plan) if name in sections]
+    if not sections:
+        return {}
+    store = ActivityStore(activity_path) if "stats" in sections else None
+    try:
+        return _fetch_github_sections(login, token, now, recent_days_window, state, paging, sections, store,
+                                      recent_repo_days, plan, history_years)
+    finally:
+        if store is not None:
+            store.close()
+
+def _fetch_github_sections(login, token, now, recent_days_window, state, paging, sections, store, recent_repo_days,
+                           plan, history_years):
+    history = load_commit_history(state)
+    since = commit_history_since(history)
+    query = compose_user_query([(name,) + GITHUB_QUERY_PARTS[name](plan) for name in sections])
+    variables = {"login": login}
+    windows = []
+    if "stats" in sections:
+        # Stores from before the watermark existed resume from their newest commit day
+        windows = activity_sync_windows(store.synced_through() or store.last_day(), now)
+        variables.update(stats_query_variables(now, windows[0], plan))
+    if "commit_analysis" in sections:
+        variables.update(since=since, pageSize=paging["page_size"])
+    with METRICS.span("query"):
+        data = gh_graphql(query, variables, token, sections=tuple(sections))
+
+    # Both aggregations page further connections lazily, so their spans include those fetches
+    results = {}
+    if "stats" in sections:
+        # A private copy, so a failed run leaves the cached repo details untouched
+        repo_cache = dict((state or {}).get("repo_details") or {})
+        with METRICS.span("aggregate.stats"):
+            slices = [data["stats"]]
+            stats_query = compose_user_query([("stats",) + stats_query_part(plan)])
+            for window in windows[1:]:
+                older = gh_graphql(stats_query, dict(stats_query_variables(now, window, plan), login=login), token,
+                                   sections=("stats",))
+                slices.append(older["stats"])
+            active_since = (now.astimezone(TZ).date() - dt.timedelta(days=recent_repo_days)).isoformat()
+            METRICS.add(activity_days_changed=sync_activity(store, slices, token, paging=paging, repo_cache=repo_cache,
+                                                            active_since=active_since, fields=detail_fields(plan),
+                                                            through=windows[0][1]))
+            restricted = (data["stats"].get("ytd") or {}).get("restrictedContributionsCount", 0)
+            results["stats"] = stats_from_activity(store, now, restricted=restricted, repo_cache=repo_cache,
+                                                   recent_days_window=recent_days_window,
+                                                   recent_repo_days=recent_repo_days)
+        if plan["history"] and history_years:
+            with METRICS.span("aggregate.history"):
+                years = history_span(history_years, (data["stats"].get("years") or {}).get("contributionYears"), now)
+                METRICS.add(activity_days_changed=sync_history(store, login, token, years, plan, paging=paging,
+                                                               repo_cache=dict(repo_cache)))
+                results["stats"]["history"] = history_stats(store, years, now, restricted=restricted)
+        if state is not None:
+            state["repo_details"] = repo_cache
+    if "commit_analysis" in sections:
+        try:
+            with METRICS.span("aggregate.commit_analysis"):
+                results["commit_analysis"] = parse_commit_analysis(data["commit_analysis"], history, now, token=token,
+                                                                   login=login, since=since, paging=paging)
+            if state is not None:
+                state["commit_history"] = history
+        except TimeoutError:
+            # Keep the repos read to the end, then let the caller fall back to the stale block
+            if state is not None:
+                state["commit_history"] = history
+            raise
+        except Exception as e:
+            print(f"[warn] Commit analysis failed: {e}", file=sys.stderr)
+    return results
+
 def render_blog_block(posts, date_format="%b %d, %Y"):
     lines = []
     lines.append("### Latest from my blog")
@@ -335,10 +1244,11 @@ def render_blog_block(posts, date_format="%b %d, %Y"):
         lines.append("_No recent posts found._")
     else:
         for p in posts:
-            d = p.get("published") or ""
-            if d:
-                d = fmt_date(d, fallback_fmt=date_format)
-                lines.append(f"- [{p['title']}]({p['link']}) — {d}")
+            d = p.get("published_at")
+            if d is not None:
+                lines.append(f"- [{p['title']}]({p['link']}) — {d.strftime(date_format)}")
+            elif p.get("published"):
+                lines.append(f"- [{p['title']}]({p['link']}) — {p['published']}")
             else:
                 lines.append(f"- [{p['title']}]({p['link']})")
     return "\n".join(lines) + "\n"
@@ -382,144 +1292,175 @@ def generate_ascii_language_chart(languages):
     lines.append("```")
     return "\n".join(lines)
 
-def analyze_commit_messages(login, token):
-    """Analyze commit messages and PR statistics for fun facts"""
+def load_commit_history(state):
+    """Return a private copy of the persisted commit aggregates so a failed run leaves state untouched"""
+    return json.loads(json.dumps((state or {}).get("commit_history") or {}))
+
+def commit_history_since(history):
+    """Return the `since:` timestamp for an incremental history fetch, or None for a full one"""
+    fetched_at = (history or {}).get("fetched_at")
+    if not fetched_at:
+        return None
+    # Re-read a small overlap so commits pushed late are still picked up; the
+    # per-repo cursors drop anything that was already folded in. Flooring to
+    # the hour keeps reruns on the same query variables (and cache key).
+    since = dt.datetime.fromisoformat(fetched_at) - COMMIT_HISTORY_OVERLAP
+    return isoformat(since.replace(minute=0, second=0, microsecond=0))
+
+def iter_repo_histories(user, since=None, token=None, login=None, paging=None):
+    """Yield (nameWithOwner, commit iterator) for every owned repo, paging both levels lazily"""
+    paging = paging or paging_options({})
+    repos = gh_graphql_pages(OWNED_REPOS_QUERY, {"login": login, "since": since}, token if login else None,
+                             ("user", "repositories"), first_page=user.get("repositories") or {},
+                             sections=("commit_analysis",), **paging)
+    for repo in repos:
+        name = repo.get("nameWithOwner") or ""
+        target = (repo.get("defaultBranchRef") or {}).get("target") or {}
+        commits = gh_graphql_pages(REPO_HISTORY_QUERY, dict(repo_query_vars(name), since=since),
+                                   token if name else None,
+                                   ("repository", "defaultBranchRef", "target", "history"),
+                                   first_page=target.get("history") or {}, sections=("commit_analysis",), **paging)
+        yield name, commits
+
+def load_word_summary(history):
+    """The persisted top-words summary, folding in the unbounded `words` dict older runs kept"""
+    words = SpaceSaving.from_dict(history.get("top_words"))
+    legacy = history.pop("words", None)
+    if legacy:
+        words.update(legacy)
+    return words
+
+def fold_commit_history(history, repo_histories, now):
+    """Fold commits newer than each repo's cursor into the running aggregates (in place)
+
+    `repo_histories` yields (nameWithOwner, commits newest-first) pairs and is
+    consumed as a stream. A repo is folded in only once its history was read
+    to the end, so when reading stops early (a timeout) the aggregates and
+    cursors still cover whole repos; fetched_at then stays where it was, and
+    the next run reads the remaining repos again.
+    """
+    cursors = history.setdefault("repos", {})
+    commits_by_minute = history.setdefault("minutes", {})
+    commits_by_day = history.setdefault("days", {})
+    analyzer = CommitTextAnalyzer(load_word_summary(history))
+
+    complete = False
     try:
-        import re
-        from collections import Counter, defaultdict
-        
-        # Get commits and PR statistics
-        query = """
-        query($login: String!) {
-          user(login: $login) {
-            contributionsCollection {
-              pullRequestContributions(first: 100) {
-                totalCount
-                nodes {
-                  pullRequest {
-                    merged
-                    createdAt
-                  }
-                }
-              }
-            }
-            repositories(first: 50, orderBy: {field: PUSHED_AT, direction: DESC}, ownerAffiliations: OWNER) {
-              nodes {
-                defaultBranchRef {
-                  target {
-                    ... on Commit {
-                      history(first: 100) {
-                        nodes {
-                          message
-                          committedDate
-                        }
-                      }
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
-        """
-        
-        variables = {"login": login}
-        data = gh_graphql(query, variables, token)
-        
-        # Process PR data
-        pr_contributions = data["user"]["contributionsCollection"].get("pullRequestContributions", {})
-        total_prs = pr_contributions.get("totalCount", 0)
-        pr_nodes = pr_contributions.get("nodes", [])
-        merged_prs = sum(1 for node in pr_nodes if node.get("pullRequest", {}).get("merged", False))
-        
-        # Process commits
-        commits = []
-        for repo in data["user"]["repositories"]["nodes"]:
-            if repo.get("defaultBranchRef") and repo["defaultBranchRef"].get("target"):
-                history = repo["defaultBranchRef"]["target"].get("history", {}).get("nodes", [])
-                for commit in history:
-                    commits.append({
-                        'message': commit.get('message', ''),
-                        'date': commit.get('committedDate', '')
-                    })
-        
-        if not commits:
-            return None
-            
-        # Analyze commit messages
-        all_words = []
-        oops_count = 0
-        commits_by_minute = defaultdict(int)
-        
-        oops_keywords = ['oops', 'plz work', 'please work', 'dammit', 'fix']
-        
-        for commit in commits:
-            message = commit['message'].lower()
-            
-            # Extract words (better filtering for meaningful words)
-            # Remove common git patterns and get meaningful words
-            clean_msg = re.sub(r'^(feat|fix|docs|style|refactor|test|chore)[\(:].*?[\):]\s*', '', message)
-            words = re.findall(r'\b\w{4,}\b', clean_msg)  # 4+ letter words
-            # Filter out common commit words and generic terms
-            excluded = {'feat', 'fix', 'add', 'update', 'remove', 'delete', 'change', 'modify', 
-                       'create', 'make', 'implement', 'improve', 'refactor', 'clean', 'bump',
-                       'merge', 'initial', 'commit', 'changes', 'files', 'code', 'work',
-                       'with', 'from', 'for', 'and', 'the', 'this', 'that', 'more', 'some'}
-            words = [w for w in words if w.lower() not in excluded and len(w) >= 4]
-            all_words.extend(words)
-            
-            # Check for "oops" keywords
-            for keyword in oops_keywords:
-                if keyword in message:
-                    oops_count += 1
+        for name, nodes in repo_histories:
+            cursor = cursors.get(name) or {}
+            seen_date = cursor.get("date", "")
+            seen_oids = set(cursor.get("oids", []))
+            newest_date = seen_date
+            newest_oids = list(seen_oids)
+            messages = []
+            dates = []
+
+            for commit in nodes:
+                date = commit.get('committedDate', '') or ''
+                oid = commit.get('oid', '') or ''
+                # Already analyzed on a previous run; history is newest-first, so
+                # stop before paging any further back
+                if date < seen_date:
                     break
-            
-            # Count commits per minute
-            if commit['date']:
-                try:
-                    # Extract minute from timestamp
-                    minute = commit['date'][:16]  # YYYY-MM-DDTHH:MM
-                    commits_by_minute[minute] += 1
-                except:
-                    pass
-        
-        # Get a random interesting word instead of most common
-        word_counts = Counter(all_words)
-        if word_counts:
-            # Filter to interesting words (not too common, not too rare)
-            interesting_words = [(word, count) for word, count in word_counts.items() 
-                               if 2 <= count <= 20 and len(word) >= 5]
-            if interesting_words:
-                import random
-                random_word, word_frequency = random.choice(interesting_words)
-            else:
-                # Fallback to most common if no interesting words found
-                random_word, word_frequency = word_counts.most_common(1)[0]
-        else:
-            random_word, word_frequency = 'code', 1
-        
-        # Get max commits in one minute
-        max_commits_per_minute = max(commits_by_minute.values()) if commits_by_minute else 0
-        
-        # Calculate fun facts
-        avg_commits_per_day = len(commits) / max(1, len(set(c['date'][:10] for c in commits if c['date'])))
-        merge_rate = (merged_prs / max(1, total_prs)) * 100 if total_prs > 0 else 0
-        
-        return {
-            'random_word': random_word,
-            'word_frequency': word_frequency,
-            'max_commits_per_minute': max_commits_per_minute,
-            'total_prs': total_prs,
-            'merged_prs': merged_prs,
-            'merge_rate': round(merge_rate, 1),
-            'avg_commits_per_day': round(avg_commits_per_day, 1)
-        }
-        
-    except Exception as e:
-        print(f"Commit analysis failed: {e}")
+                if date == seen_date and oid in seen_oids:
+                    continue
+
+                messages.append(commit.get('message', ''))
+                dates.append(date)
+
+                if date > newest_date:
+                    newest_date, newest_oids = date, [oid]
+                elif date == newest_date and oid not in newest_oids:
+                    newest_oids.append(oid)
+
+            for message in messages:
+                analyzer.add(message)
+            # Count commits per minute and per day
+            for date in dates:
+                if date:
+                    minute = date[:16]  # YYYY-MM-DDTHH:MM
+                    commits_by_minute[minute] = commits_by_minute.get(minute, 0) + 1
+                    commits_by_day[date[:10]] = commits_by_day.get(date[:10], 0) + 1
+            history["total"] = history.get("total", 0) + len(dates)
+
+            if name and newest_date:
+                cursors[name] = {"oid": newest_oids[0] if newest_oids else "", "date": newest_date, "oids": newest_oids}
+        complete = True
+    finally:
+        analyzer.flush()
+        history["oops"] = history.get("oops", 0) + analyzer.oops
+        history["top_words"] = analyzer.words.to_dict()
+
+        # Minutes older than the next fetch window can no longer grow; keep only their max
+        if commits_by_minute:
+            history["max_per_minute"] = max(history.get("max_per_minute", 0), max(commits_by_minute.values()))
+        horizon = isoformat(now - COMMIT_HISTORY_OVERLAP)[:16]
+        for minute in [m for m in commits_by_minute if m < horizon]:
+            del commits_by_minute[minute]
+        if complete:
+            history["fetched_at"] = isoformat(now)
+    return history
+
+def parse_commit_analysis(user, history=None, now=None, token=None, login=None, since=None, paging=None):
+    """Compute commit/PR fun facts from the `commit_analysis` slice of a user query
+
+    `history` holds the running aggregates from earlier runs and is updated in
+    place with the commits in this response. Further repository and history
+    pages are fetched with `token` as they are consumed.
+    """
+    now = now or dt.datetime.now(TZ)
+    history = history if history is not None else {}
+
+    # Process PR data
+    # Left out of the query when pr_facts is off
+    pr_contributions = (user.get("contributionsCollection") or {}).get("pullRequestContributions") or {}
+    total_prs = pr_contributions.get("totalCount", 0)
+    pr_nodes = pr_contributions.get("nodes", [])
+    merged_prs = sum(1 for node in pr_nodes if node.get("pullRequest", {}).get("merged", False))
+
+    # Process commits
+    repo_histories = iter_repo_histories(user, since=since, token=token, login=login, paging=paging)
+    fold_commit_history(history, repo_histories, now)
+    total_commits = history.get("total", 0)
+    if not total_commits:
         return None
 
-def render_stats_block(stats, max_languages=6, max_frameworks=6, max_repositories=8):
+    # Get a random interesting word instead of most common
+    word_counts = SpaceSaving.from_dict(history.get("top_words")).most_common()
+    if word_counts:
+        # Filter to interesting words (not too common, not too rare)
+        interesting_words = [(word, count) for word, count in word_counts
+                           if 2 <= count <= 20 and len(word) >= 5]
+        if interesting_words:
+            # Seeded by the candidates so the pick only moves when they do
+            interesting_words.sort()
+            rng = random.Random(content_digest(interesting_words))
+            random_word, word_frequency = rng.choice(interesting_words)
+        else:
+            # Fallback to most common if no interesting words found
+            random_word, word_frequency = word_counts[0]
+    else:
+        random_word, word_frequency = 'code', 1
+
+    # Get max commits in one minute
+    max_commits_per_minute = history.get("max_per_minute", 0)
+
+    # Calculate fun facts
+    avg_commits_per_day = total_commits / max(1, len(history.get("days", {})))
+    merge_rate = (merged_prs / max(1, total_prs)) * 100 if total_prs > 0 else 0
+
+    return {
+        'random_word': random_word,
+        'word_frequency': word_frequency,
+        'max_commits_per_minute': max_commits_per_minute,
+        'total_prs': total_prs,
+        'merged_prs': merged_prs,
+        'merge_rate': round(merge_rate, 1),
+        'avg_commits_per_day': round(avg_commits_per_day, 1)
+    }
+
+
+def render_stats_block(stats, max_languages=6, max_frameworks=6, max_repositories=8, language_chart=None):
     lines = []
     lines.append("## 📊 GitHub Activity")
     lines.append("")
@@ -532,6 +1473,28 @@ def render_stats_block(stats, max_languages=6, max_frameworks=6, max_repositorie
     if rc > 0:
         commits_text += f" *(+{rc} private)*"
     lines.append(commits_text)
+
+    # Week-over-week trend from the activity store
+    if stats.get("commits_this_week") is not None:
+        this_week = stats["commits_this_week"]
+        delta = this_week - stats.get("commits_last_week", 0)
+        trend = "📈" if delta > 0 else "📉" if delta < 0 else "➖"
+        trend_text = f"- This week: **{this_week}** commits ({trend} {delta:+d} vs last week)"
+        if stats.get("recent_days"):
+            trend_text += f" · **{stats.get('recent_commits', 0)}** in the last {stats['recent_days']} days"
+        lines.append(trend_text)
+
+    # Lifetime totals across the stored past years
+    history = stats.get("history")
+    if history:
+        history_text = (f"- Since {history['since']}: **{history['commits']}** commits"
+                        f" across **{history['repositories']}** repositories")
+        if history.get("restricted"):
+            history_text += f" *(+{history['restricted']} private)*"
+        top = history.get("languages", [])[:3] if max_languages > 0 else []
+        if top:
+            history_text += " · " + ", ".join(f"{name} {pct}%" for name, pct in top)
+        lines.append(history_text)
     
     # Add fun commit and PR facts
     commit_stats = stats.get('commit_analysis')
@@ -545,20 +1508,26 @@ def render_stats_block(stats, max_languages=6, max_frameworks=6, max_repositorie
     lines.append("")
 
     # Languages section with ASCII chart
-    langs = stats.get("languages", [])
-    if langs:
+    # A limit of 0 hides the part altogether
+    langs = stats.get("languages", []) if max_languages > 0 else []
+    if langs and language_chart:
+        # Link the SVG written by write_language_chart()
+        lines.append("### 💻 Programming Languages")
+        lines.append(f'<img src="{language_chart}" alt="Programming languages chart" />')
+        lines.append("")
+    elif langs:
         ascii_chart = generate_ascii_language_chart(langs[:max_languages])
         lines.append(ascii_chart)
         lines.append("")
 
     # Frameworks section - more compact
-    frames = stats.get("frameworks", [])
+    frames = stats.get("frameworks", [])[:max_frameworks]
     if frames:
-        lines.append("**🛠️ Frameworks:** " + " • ".join(frames[:max_frameworks]))
+        lines.append("**🛠️ Frameworks:** " + " • ".join(frames))
         lines.append("")
 
     # Repositories section with clean table format
-    repos = stats.get("repositories", [])
+    repos = stats.get("repositories", []) if max_repositories > 0 else []
     if repos:
         lines.append("### 📈 Active Repositories")
         lines.append("")
@@ -615,81 +1584,588 @@ def render_stats_block(stats, max_languages=6, max_frameworks=6, max_repositorie
 
     return "\n".join(lines) + "\n"
 
-def replace_block(content, start_marker, end_marker, new_block):
-    pattern = re.compile(
-        rf"({re.escape(start_marker)})(.*?){re.escape(end_marker)}",
-        re.DOTALL | re.IGNORECASE,
-    )
-    if re.search(pattern, content):
-        return re.sub(pattern, rf"\1\n{new_block}{end_marker}", content)
-    # If markers missing, append at the end
-    return content.rstrip() + f"\n\n{start_marker}\n{new_block}{end_marker}\n"
+def write_language_chart(path, languages, state):
+    """Write the SVG language chart unless these languages already produced the file on disk"""
+    digest = content_digest(languages)
+    charts = state.setdefault("charts", {})
+    if charts.get(path) == digest and os.path.isfile(path):
+        return False
+    write_atomic(path, render_language_svg(languages))
+    charts[path] = digest
+    return True
+
+def mark_stale(block, rendered_at=None):
+    """A last good block with a note that this run could not refresh it in time"""
+    when = ""
+    if rendered_at:
+        when = " from " + dt.datetime.fromisoformat(rendered_at).astimezone(TZ).strftime("%Y-%m-%d %H:%M UTC")
+    return f"> ⏳ *Could not refresh in time; showing data{when}.*\n\n" + block
+
+def iter_blocks(content):
+    """Yield (name, start match, end match) for every marker pair, in one scan of content"""
+    opened = {}
+    for m in DYNAMIC_MARKER.finditer(content):
+        name = m.group(2).lower()
+        if m.group(1).upper() == "START":
+            opened.setdefault(name, m)
+        elif name in opened:
+            yield name, opened[name], m
+            # Anything opened before this END would overlap the pair just yielded
+            opened.clear()
 
-def main():
-    cfg = load_config()
-    state = ensure_state()
+def read_blocks(content):
+    """Map each section name to the text between its markers, as splice_blocks() writes it"""
+    blocks = {}
+    for name, start, end in iter_blocks(content):
+        block = content[start.end():end.start()]
+        blocks.setdefault(name, block[1:] if block.startswith("\n") else block)
+    return blocks
 
-    rss_url = (cfg.get("blog") or {}).get("rss_url") or DEFAULT_RSS
+def splice_blocks(content, blocks):
+    """Swap the body of every section named in `blocks` in a single pass
+
+    Sections whose markers are missing are appended at the end.
+    """
+    out = []
+    pos = 0
+    spliced = set()
+    for name, start, end in iter_blocks(content):
+        if name not in blocks:
+            continue
+        out.append(content[pos:start.end()])
+        out.append("\n" + blocks[name])
+        pos = end.start()
+        spliced.add(name)
+    out.append(content[pos:])
+    content = "".join(out)
+    for name, block in blocks.items():
+        if name not in spliced:
+            content = content.rstrip() + f"\n\n<!-- DYNAMIC:START:{name} -->\n{block}<!-- DYNAMIC:END:{name} -->\n"
+    return content
+
+def run_fetch_stage(providers, max_workers=None):
+    """Run provider callables concurrently, returning (results, errors) keyed by name"""
+    results = {}
+    errors = {}
+    if not providers:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=max_workers or len(providers)) as pool:
+        futures = {name: submit_in_context(pool, fn) for name, fn in providers.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = e
+    return results, errors
+
+# Every section the README is built from: the block it renders into and its
+# default refresh interval in seconds (0 = every run). The "refresh" config
+# section overrides the intervals.
+SECTION_REGISTRY = {
+    "blog": {"block": "blog", "refresh": 0},
+    "stats": {"block": "stats", "refresh": 6 * 3600},
+    "commit_analysis": {"block": "stats", "refresh": 24 * 3600},
+}
+# Scheduled runs start a few minutes late; don't push a section back a whole run for that
+REFRESH_SLACK = dt.timedelta(minutes=10)
+
+def refresh_intervals(cfg):
+    overrides = cfg.get("refresh") or {}
+    return {name: float(overrides.get(name, spec["refresh"])) for name, spec in SECTION_REGISTRY.items()}
+
+def due_sections(state, intervals, now, force=False):
+    """Names of the sections whose refresh interval has elapsed (or that have never run)"""
+    section_state = state.get("sections") or {}
+    due = set()
+    for name, interval in intervals.items():
+        entry = section_state.get(name) or {}
+        last = entry.get("last_refresh")
+        if force or interval <= 0 or not last or "data" not in entry:
+            due.add(name)
+        elif dt.datetime.fromisoformat(last) + dt.timedelta(seconds=interval) - REFRESH_SLACK <= now:
+            due.add(name)
+    return due
+
+def record_refresh(state, name, data, interval, now):
+    """Keep a section's last good data, and when it ran if it is not refreshed every run"""
+    entry = {"data": data}
+    # An every-run section needs no clock, and leaving it out keeps idle runs from touching state
+    if interval > 0:
+        entry["last_refresh"] = isoformat(now)
+    state.setdefault("sections", {})[name] = entry
+
+def section_data(state, name):
+    return ((state.get("sections") or {}).get(name) or {}).get("data")
+
+def traced(name, fn):
+    """Wrap a provider callable so it runs inside its own metrics span"""
+    def run():
+        with METRICS.span(name):
+            return fn()
+    return run
+
+def update_profile(login, token, cfg, readme_path="README.md", state_path=STATE_PATH, force=False, state=None):
+    """Fetch, render and splice every due section of one profile README
+
+    Sections that are not due keep their last good block. `force` refreshes
+    and re-renders everything. A long-running caller can pass the `state`
+    dict it keeps in memory instead of having it re-read from state_path.
+    Returns a result dict with the profile's status, warnings and timing.
+    """
+    with METRICS.span("profile", login=(login or "").strip()):
+        return _update_profile(login, token, cfg, readme_path, state_path, force, state)
+
+def _update_profile(login, token, cfg, readme_path, state_path, force=False, state=None):
+    started = time.perf_counter()
+    now = dt.datetime.now(TZ)
+    if state is None:
+        with METRICS.span("state_load"):
+            state = ensure_state(state_path)
+    loaded_fingerprint = state_fingerprint(state)
+    warnings = []
+
+    rss_urls = feed_urls(cfg.get("blog") or {})
     max_items = int((cfg.get("blog") or {}).get("max_items", 5))
     date_fmt = (cfg.get("blog") or {}).get("date_format", "%b %d, %Y")
 
+    paging = paging_options(cfg)
+
     stats_cfg = (cfg.get("stats") or {})
     recent_days = int(stats_cfg.get("recent_days_window", 90))
+    recent_repo_days = int(stats_cfg.get("recent_repo_days", 60))
     max_langs = int(stats_cfg.get("max_languages", 6))
     max_frames = int(stats_cfg.get("max_frameworks", 6))
+    max_repos = int(stats_cfg.get("max_repositories", 8))
+    plan = query_plan(cfg)
+    # The SVG chart sits next to the README; "chart": "svg" shows it instead of
+    # the ASCII one, and it is only written then
+    chart_name = stats_cfg.get("chart_file", "languages_chart.svg")
+    chart_link = chart_name if chart_name and max_langs > 0 and stats_cfg.get("chart") == "svg" else None
+    chart_path = os.path.join(os.path.dirname(readme_path), chart_link) if chart_link else None
+    chart_written = False
 
-    blog_block = None
-    stats_block = None
+    intervals = refresh_intervals(cfg)
+    due = due_sections(state, intervals, now, force=force)
 
-    # Fetch blog posts
-    try:
-        blog_result = fetch_blog_posts(rss_url, max_items, state)
-        if not blog_result.get("unchanged", False):
-            blog_block = render_blog_block(blog_result.get("posts", []), date_fmt)
-    except Exception as e:
-        print(f"[warn] Blog fetch failed: {e}", file=sys.stderr)
+    # Start every due provider at once; wall-clock time is that of the slowest call
+    providers = {}
+    if "blog" in due:
+        providers["blog"] = traced("fetch.blog", lambda: fetch_blog_posts(rss_urls, max_items, state))
+    github_due = [name for name in planned_sections(plan) if name in due]
+    login = (login or "").strip()
+    if github_due:
+        if not token:
+            warnings.append("[error] GITHUB_TOKEN is not set")
+        elif login:
+            providers["github"] = traced("fetch.github", lambda: fetch_github_sections(
+                login, token, recent_days_window=recent_days, state=state, paging=paging, sections=github_due,
+                activity_path=activity_store_path(state_path), recent_repo_days=recent_repo_days, plan=plan,
+                history_years=stats_cfg.get("history_years", 0)))
 
-    # Fetch GitHub stats with commit analysis
-    token = GITHUB_TOKEN
-    if not token:
-        print("[error] GITHUB_TOKEN is not set", file=sys.stderr)
-    else:
+    results, errors = run_fetch_stage(providers)
+    if github_due and token and not login:
+        errors["github"] = RuntimeError("GH_LOGIN not set")
+
+    # Load README
+    content = ""
+    if os.path.isfile(readme_path):
+        with open(readme_path, "r", encoding="utf-8") as f:
+            content = f.read()
+    original_content = content
+
+    # Sections whose data digest matches the last run, and whose block is
+    # still in the README as rendered, are neither re-rendered nor rewritten
+    digests = state.setdefault("digests", {})
+    last_good = state.setdefault("blocks", {})
+    current_blocks = read_blocks(content)
+    blocks = {}
+
+    def changed(block, data):
+        previous = digests.get(block) or {}
+        current = current_blocks.get(block)
+        return force or not (previous.get("data") == content_digest(data)
+                             and current is not None and previous.get("block") == content_digest(current))
+
+    def remember(block, data, text):
+        digests[block] = {"data": content_digest(data), "block": content_digest(text), "rendered_at": isoformat(now)}
+        last_good[block] = text
+        blocks[block] = text
+
+    # A provider that ran out of time republishes its last good block, marked stale
+    stale = []
+
+    def fall_back(block, error, sections):
+        if not isinstance(error, TimeoutError) or block not in last_good:
+            return
+        blocks[block] = mark_stale(last_good[block], (digests.get(block) or {}).get("rendered_at"))
+        stale.append(block)
+        warnings.append(f"[warn] Kept the last good {block} block, marked stale")
+        # Due again next run, whatever their interval, so the stale note does not linger
+        for name in sections:
+            ((state.get("sections") or {}).get(name) or {}).pop("last_refresh", None)
+
+    # Blog posts
+    if "blog" in errors:
+        warnings.append(f"[warn] Blog fetch failed: {errors['blog']}")
+        fall_back("blog", errors["blog"], ["blog"])
+    elif "blog" in results:
+        posts = [{k: p.get(k) for k in ("title", "link", "published")} for p in results["blog"]["posts"]]
+        record_refresh(state, "blog", posts, intervals["blog"], now)
+        render_input = {"posts": posts, "date_format": date_fmt}
+        if changed("blog", render_input):
+            with METRICS.span("render.blog"):
+                block = render_blog_block(results["blog"]["posts"], date_fmt)
+            remember("blog", render_input, block)
+
+    # GitHub stats with commit analysis; whichever half was not due comes from state
+    if "github" in errors:
+        warnings.append(f"[warn] GitHub stats fetch failed: {errors['github']}")
+        fall_back("stats", errors["github"], github_due)
+    elif "github" in results:
+        for name, data in results["github"].items():
+            record_refresh(state, name, data, intervals[name], now)
         try:
-            login = GH_LOGIN.strip()
-            if not login:
-                raise RuntimeError("GH_LOGIN not set")
-            stats = fetch_github_stats(login, token, recent_days_window=recent_days)
-            
-            # Add commit analysis
-            commit_analysis = analyze_commit_messages(login, token)
-            if commit_analysis:
-                stats['commit_analysis'] = commit_analysis
-            
-            stats_block = render_stats_block(stats, max_languages=max_langs, max_frameworks=max_frames)
+            stats = section_data(state, "stats")
+            if stats is not None:
+                stats = dict(stats)
+                # Data kept from before a fact was turned off is not shown either
+                if not plan["private"]:
+                    stats["restricted_commits_year"] = 0
+                if not plan["history"]:
+                    stats.pop("history", None)
+                elif stats.get("history") and not plan["private"]:
+                    stats["history"] = dict(stats["history"], restricted=0)
+                commit_analysis = section_data(state, "commit_analysis") if plan["commit_facts"] else None
+                if commit_analysis:
+                    if not plan["pr_facts"]:
+                        commit_analysis = dict(commit_analysis, total_prs=0, merged_prs=0, merge_rate=0)
+                    stats['commit_analysis'] = commit_analysis
+                render_input = {"stats": stats, "max_languages": max_langs, "max_frameworks": max_frames,
+                                "max_repositories": max_repos, "chart": chart_link}
+                if changed("stats", render_input):
+                    with METRICS.span("render.stats"):
+                        block = render_stats_block(stats, max_languages=max_langs, max_frameworks=max_frames,
+                                                   max_repositories=max_repos, language_chart=chart_link)
+                    remember("stats", render_input, block)
+                if chart_path:
+                    with METRICS.span("render.chart"):
+                        chart_written = write_language_chart(chart_path, stats.get("languages", [])[:max_langs], state)
         except Exception as e:
-            print(f"[warn] GitHub stats fetch failed: {e}", file=sys.stderr)
+            warnings.append(f"[warn] GitHub stats fetch failed: {e}")
 
-    # Load README
-    with open("README.md", "r", encoding="utf-8") as f:
-        content = f.read()
+    # A block missing from the README (markers deleted by hand) gets its last good copy back
+    for block, text in last_good.items():
+        if block not in current_blocks and block not in blocks:
+            blocks[block] = text
 
-    original_content = content
+    with METRICS.span("write"):
+        if blocks:
+            content = splice_blocks(content, blocks)
+
+        # Superseded by the per-section digests
+        state.pop("last_hash", None)
+        # Leave the state store byte-for-byte alone when nothing worth keeping
+        # moved, so the workflow finds nothing to commit
+        if state_fingerprint(state) != loaded_fingerprint:
+            save_state(state, state_path)
+
+        updated = content != original_content
+        if updated:
+            write_atomic(readme_path, content)
+
+    return {
+        "login": login,
+        "readme": readme_path,
+        "status": "updated" if updated or chart_written else "unchanged",
+        "refreshed": sorted([name for name in ("blog",) if name in results] + list(results.get("github", {}))),
+        "sections_failed": sorted(errors),
+        "stale": stale,
+        "warnings": warnings,
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
 
-    if blog_block is not None:
-        content = replace_block(content, BLOG_START, BLOG_END, blog_block)
-    if stats_block is not None:
-        content = replace_block(content, STATS_START, STATS_END, stats_block)
+# Config read once per process, so a batch profile cannot override it: whole
+# sections, or (for "graphql") the keys of the shared scheduler
+PROCESS_WIDE_CONFIG = {
+    "cache": None,
+    "deadline": None,
+    "metrics": None,
+    "watch": None,
+    "graphql": ("max_in_flight", "max_retries", "max_rate_limit_wait"),
+}
 
-    # Save state snapshot hash to skip no-op commits
-    state["last_hash"] = str(hash((blog_block or "",))) + ":" + str(hash((stats_block or "",)))
-    save_state(state)
+def process_wide_keys(profile_cfg):
+    """The keys of a profile's config that only the top-level config can set"""
+    keys = []
+    for section, names in PROCESS_WIDE_CONFIG.items():
+        if section not in profile_cfg:
+            continue
+        if names is None:
+            keys.append(section)
+        else:
+            keys.extend(f"{section}.{name}" for name in names if name in (profile_cfg[section] or {}))
+    return keys
 
-    if content != original_content:
-        with open("README.md", "w", encoding="utf-8") as f:
-            f.write(content)
+def load_manifest(path):
+    """Read a batch manifest: a list of profiles, or {"workers": n, "profiles": [...]}
+
+    A profile's "config" is merged over the top-level config; the settings
+    in PROCESS_WIDE_CONFIG are shared by every profile and are refused there.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"profiles": manifest}
+    profiles = []
+    for entry in manifest.get("profiles", []):
+        if isinstance(entry, str):
+            entry = {"login": entry}
+        login = (entry.get("login") or "").strip()
+        if not login:
+            raise ValueError(f"Manifest entry without a login: {entry}")
+        shared = process_wide_keys(entry.get("config") or {})
+        if shared:
+            raise ValueError(f"Manifest profile {login} sets {', '.join(shared)}, which apply to the whole batch; "
+                             f"set them in the top-level config instead")
+        profiles.append({
+            "login": login,
+            "readme": entry.get("readme") or os.path.join("profiles", login, "README.md"),
+            "state": entry.get("state") or os.path.join(STATE_DIR, "profiles", f"{login}.json"),
+            "config": entry.get("config") or {},
+        })
+    manifest["profiles"] = profiles
+    return manifest
+
+def run_batch(manifest, cfg, token, workers=None, force=False):
+    """Update every profile in the manifest on one shared worker pool
+
+    All profiles share the module-level transport, scheduler and response
+    cache, so connections, the rate-limit budget and cached responses are
+    reused across logins.
+    """
+    profiles = manifest["profiles"]
+    workers = int(workers or manifest.get("workers") or 4)
+    started = time.perf_counter()
+
+    def run(profile):
+        profile_started = time.perf_counter()
+        try:
+            return update_profile(profile["login"], token, merge_config(cfg, profile["config"]),
+                                  readme_path=profile["readme"], state_path=profile["state"], force=force)
+        except Exception as e:
+            return {"login": profile["login"], "readme": profile["readme"], "status": "failed",
+                    "sections_failed": [], "warnings": [f"[error] {e}"],
+                    "elapsed": round(time.perf_counter() - profile_started, 3)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [submit_in_context(pool, run, profile) for profile in profiles]
+        results = [future.result() for future in futures]
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {
+        "generated_at": isoformat(dt.datetime.now(TZ)),
+        "workers": workers,
+        "elapsed": round(time.perf_counter() - started, 3),
+        "counts": counts,
+        "profiles": results,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Update the dynamic sections of README.md")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the GraphQL response cache for this run")
+    parser.add_argument("--clear-cache", nargs="?", const="all", metavar="SECTION",
+                        help="invalidate cached responses for SECTION (default: all) before running")
+    parser.add_argument("--batch", metavar="MANIFEST",
+                        help="render every profile listed in a JSON manifest instead of GH_LOGIN")
+    parser.add_argument("--workers", type=int, help="worker threads for --batch (default: manifest or 4)")
+    parser.add_argument("--summary", default=os.path.join(STATE_DIR, "batch-summary.json"),
+                        help="where --batch writes its JSON summary")
+    parser.add_argument("--refresh-all", action="store_true",
+                        help="refresh and re-render every section, ignoring refresh intervals and digests")
+    parser.add_argument("--metrics-summary", action="store_true",
+                        help="print per-stage timings, bytes and GraphQL cost to stderr")
+    parser.add_argument("--watch", action="store_true",
+                        help="stay resident and refresh sections as they fall due")
+    parser.add_argument("--poll", type=float,
+                        help="seconds between --watch polls of every-run sections (default: watch.poll or 60)")
+    parser.add_argument("--config", default=CONFIG_PATH, help=f"config file (default: {CONFIG_PATH})")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="time budget for fetching; late sections keep their last good block "
+                             "(default: deadline.seconds, else none)")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--record", metavar="DIR", help="save every HTTP response as a fixture in DIR")
+    transport.add_argument("--replay", metavar="DIR",
+                           help="serve HTTP responses from fixtures in DIR instead of the network")
+    parser.add_argument("--replay-latency", type=float, default=0.0, metavar="SECONDS",
+                        help="delay added to every replayed response")
+    parser.add_argument("--replay-jitter", type=float, default=0.0, metavar="SECONDS",
+                        help="random extra delay, up to this much, per replayed response")
+    parser.add_argument("--replay-error-rate", type=float, default=0.0, metavar="P",
+                        help="fraction of replayed requests that fail")
+    parser.add_argument("--replay-error-status", type=int, default=502,
+                        help="HTTP status of injected failures (0 drops the connection instead)")
+    parser.add_argument("--replay-seed", type=int, default=0, help="seed for injected jitter and failures")
+    args = parser.parse_args(argv)
+    if args.watch and args.batch:
+        parser.error("--watch cannot be combined with --batch")
+    return args
+
+def write_metrics(root, cfg, show_summary=False):
+    """Append this run's spans to the rolling metrics (and optionally stderr)
+
+    Runs are kept in the state store's metrics table, or in a JSON file when
+    the "metrics" config section sets a path.
+    """
+    metrics_cfg = (cfg.get("metrics") or {})
+    records = root.records()
+    record = {
+        "started_at": isoformat(root.started_at),
+        "wall_ms": root.wall_ms,
+        "spans": records,
+        "graphql": SCHEDULER.snapshot(),
+    }
+    if RESPONSE_CACHE is not None:
+        record["cache"] = {"hits": RESPONSE_CACHE.hits, "misses": RESPONSE_CACHE.misses}
+    try:
+        history = max(1, int(metrics_cfg.get("history", DEFAULT_METRICS_HISTORY)))
+        if metrics_cfg.get("path"):
+            append_run(metrics_cfg["path"], record, history=history)
+        else:
+            state_store().append_metrics(record, history)
+    except Exception as e:
+        print(f"[warn] Could not write metrics: {e}", file=sys.stderr)
+    if show_summary or metrics_cfg.get("summary"):
+        print_summary(records)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_transport(args)
+    if args.watch:
+        watch(args)
+        return
+    cfg = {}
+    root = None
+    try:
+        with METRICS.span("run", mode="batch" if args.batch else "single") as root:
+            with METRICS.span("config_load"):
+                cfg = load_config(args.config)
+            with deadline_scope(run_deadline(args, cfg)):
+                run_updates(args, cfg)
+    finally:
+        if root is not None:
+            write_metrics(root, cfg, show_summary=args.metrics_summary)
+        close_state_store()
+
+def run_deadline(args, cfg):
+    """The fetch budget for one run (or one --watch poll): --deadline, else deadline.seconds"""
+    seconds = args.deadline if args.deadline is not None else (cfg.get("deadline") or {}).get("seconds")
+    return Deadline(float(seconds) if seconds else None)
+
+def configure(args, cfg, previous=None):
+    """Apply the scheduler and cache config sections, skipping any that did not change"""
+    previous = previous or {}
+    if previous.get("graphql") != cfg.get("graphql") or not previous:
+        configure_scheduler(cfg)
+    if previous.get("cache") != cfg.get("cache") or not previous:
+        configure_cache(cfg, enabled=not args.no_cache)
+
+def run_updates(args, cfg):
+    configure(args, cfg)
+    if args.clear_cache:
+        cache = RESPONSE_CACHE or ResponseCache(state_store())
+        cache.invalidate(section=None if args.clear_cache == "all" else args.clear_cache)
+
+    if args.batch:
+        summary = run_batch(load_manifest(args.batch), cfg, GITHUB_TOKEN, workers=args.workers,
+                            force=args.refresh_all)
+        for result in summary["profiles"]:
+            for warning in result["warnings"]:
+                print(f"{warning} ({result['login']})", file=sys.stderr)
+            print(f"{result['login']}: {result['status']} in {result['elapsed']}s -> {result['readme']}")
+        write_atomic(args.summary, json.dumps(summary, indent=2))
+        counts = ", ".join(f"{n} {status}" for status, n in sorted(summary["counts"].items()))
+        print(f"Batch finished in {summary['elapsed']}s: {counts}")
+        return
+
+    result = update_profile(GH_LOGIN, GITHUB_TOKEN, cfg, force=args.refresh_all)
+    for warning in result["warnings"]:
+        print(warning, file=sys.stderr)
+    if result["status"] == "updated":
         print("README updated.")
     else:
         print("No updates to README.")
 
+WATCH_POLL = 60.0
+
+def next_refresh_in(state, intervals, now, poll):
+    """Seconds until the next scheduled section falls due, at most `poll`"""
+    wait = poll
+    section_state = state.get("sections") or {}
+    for name, interval in intervals.items():
+        last = (section_state.get(name) or {}).get("last_refresh")
+        # Every-run sections (and ones that never succeeded) are retried each poll
+        if interval <= 0 or not last:
+            continue
+        due_at = dt.datetime.fromisoformat(last) + dt.timedelta(seconds=interval) - REFRESH_SLACK
+        wait = min(wait, (due_at - now).total_seconds())
+    return max(1.0, wait)
+
+def config_mtime(cfg_path=CONFIG_PATH):
+    try:
+        return os.stat(cfg_path).st_mtime
+    except OSError:
+        return None
+
+def watch(args):
+    """Keep one process resident, refreshing each section on its own schedule
+
+    The transport's connection pool, the response cache index, the parsed
+    config and the state dict all stay in memory between polls; the config
+    is re-read only when its file changes. SIGINT/SIGTERM stop the loop
+    after the current poll.
+    """
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    cfg = load_config(args.config)
+    cfg_mtime = config_mtime(args.config)
+    configure(args, cfg)
+    if args.clear_cache:
+        cache = RESPONSE_CACHE or ResponseCache(state_store())
+        cache.invalidate(section=None if args.clear_cache == "all" else args.clear_cache)
+    state = ensure_state(STATE_PATH)
+    force = args.refresh_all
+    print(f"Watching {GH_LOGIN or '(no login)'}; Ctrl-C to stop.")
+
+    try:
+        while not stop.is_set():
+            with METRICS.span("run", mode="watch") as root:
+                mtime = config_mtime(args.config)
+                if mtime != cfg_mtime:
+                    with METRICS.span("config_load"):
+                        previous, cfg, cfg_mtime = cfg, load_config(args.config), mtime
+                    configure(args, cfg, previous)
+                    print("Config changed; reloaded.")
+                with deadline_scope(run_deadline(args, cfg)):
+                    result = update_profile(GH_LOGIN, GITHUB_TOKEN, cfg, force=force, state=state)
+            write_metrics(root, cfg, show_summary=args.metrics_summary)
+            force = False
+
+            stamp = dt.datetime.now(TZ).strftime("%Y-%m-%d %H:%M:%S")
+            for warning in result["warnings"]:
+                print(f"{stamp} {warning}", file=sys.stderr)
+            if result["status"] == "updated":
+                print(f"{stamp} README updated ({', '.join(result['refreshed']) or 'restored blocks'}).")
+
+            poll = args.poll or float((cfg.get("watch") or {}).get("poll", WATCH_POLL))
+            stop.wait(next_refresh_in(state, refresh_intervals(cfg), dt.datetime.now(TZ), poll))
+    finally:
+        TRANSPORT.close()
+        close_state_store()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,45 @@
+import datetime as dt
+
+import update_readme as ur
+from activity_store import ActivityStore
+
+NOW = dt.datetime(2026, 10, 18, 12, tzinfo=dt.timezone.utc)
+
+
+def test_empty_store_syncs_from_start_of_year():
+    windows = ur.activity_sync_windows(None, NOW)
+    assert windows[0] == (dt.date(2026, 7, 21), dt.date(2026, 10, 18))
+    assert windows[-1][0] == dt.date(2026, 1, 1)
+    assert all((last - first).days < ur.ACTIVITY_SYNC_DAYS for first, last in windows)
+
+
+def test_watermark_limits_sync_to_new_days():
+    assert ur.activity_sync_windows("2026-10-17", NOW) == [(dt.date(2026, 10, 16), dt.date(2026, 10, 18))]
+
+
+def test_sync_never_spans_more_than_a_year():
+    windows = ur.activity_sync_windows("2020-01-01", NOW)
+    assert windows[-1][0] == dt.date(2025, 10, 19)
+
+
+def test_watermark_survives_quiet_stretches(tmp_path):
+    with ActivityStore(str(tmp_path / "activity.sqlite")) as store:
+        assert store.synced_through() is None
+        store.record({("2026-03-02", "me/app"): 4}, {"me/app": {"Python": 1.0}}, {"me/app": {"stars": 1}})
+        store.mark_synced("2026-10-18")
+        assert store.last_day() == "2026-03-02"
+        assert store.synced_through() == "2026-10-18"
+        assert store.total("2026-01-01") == 4
+        assert store.language_totals("2026-01-01") == {"Python": 4.0}
+
+
+def test_unchanged_record_leaves_file_alone(tmp_path):
+    path = tmp_path / "activity.sqlite"
+    with ActivityStore(str(path)) as store:
+        store.record({("2026-03-02", "me/app"): 4}, repos={"me/app": {"stars": 1}})
+        store.mark_synced("2026-10-18")
+    before = path.read_bytes()
+    with ActivityStore(str(path)) as store:
+        assert store.record({("2026-03-02", "me/app"): 4}, repos={"me/app": {"stars": 1}}) == 0
+        store.mark_synced("2026-10-18")
+    assert path.read_bytes() == before
@@ -0,0 +1,41 @@
+import update_readme as ur
+
+README = """# Hi
+
+<!-- DYNAMIC:START:blog -->
+old posts
+<!-- DYNAMIC:END:blog -->
+
+middle
+
+<!-- dynamic:start:STATS -->
+old stats
+<!-- DYNAMIC:END:stats -->
+"""
+
+
+def test_iter_blocks_pairs_markers_case_insensitively():
+    assert [name for name, _, _ in ur.iter_blocks(README)] == ["blog", "stats"]
+
+
+def test_overlapping_markers_yield_the_first_closed_pair():
+    content = "<!-- DYNAMIC:START:a -->x<!-- DYNAMIC:START:b -->y<!-- DYNAMIC:END:a -->z<!-- DYNAMIC:END:b -->"
+    assert [name for name, _, _ in ur.iter_blocks(content)] == ["a"]
+
+
+def test_splice_replaces_only_named_blocks():
+    out = ur.splice_blocks(README, {"stats": "new stats\n"})
+    assert "old posts" in out
+    assert "old stats" not in out
+    assert ur.read_blocks(out) == {"blog": "old posts\n", "stats": "new stats\n"}
+    assert out.endswith("<!-- DYNAMIC:END:stats -->\n")
+
+
+def test_splice_round_trips_through_read_blocks():
+    blocks = ur.read_blocks(README)
+    assert ur.splice_blocks(README, blocks) == README
+
+
+def test_missing_block_is_appended():
+    out = ur.splice_blocks("# Hi\n", {"blog": "posts\n"})
+    assert out == "# Hi\n\n<!-- DYNAMIC:START:blog -->\nposts\n<!-- DYNAMIC:END:blog -->\n"
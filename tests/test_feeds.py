@@ -0,0 +1,48 @@
+import update_readme as ur
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Blog</title>
+<item><title>Second</title><link>https://example.com/2</link><pubDate>Tue, 02 Jun 2026 10:00:00 GMT</pubDate></item>
+<item><title>No link</title><pubDate>Mon, 01 Jun 2026 10:00:00 GMT</pubDate></item>
+<item><title>First</title><link>https://example.com/1</link><guid>post-1</guid></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Notes</title>
+<entry><title>Atom post</title><link href="https://example.com/a"/><id>urn:a</id>
+<updated>2026-06-03T08:00:00Z</updated></entry>
+</feed>"""
+
+
+def test_rss_skips_entries_without_a_link():
+    items = ur.parse_rss_or_atom(RSS)
+    assert [item["title"] for item in items] == ["Second", "First"]
+    assert items[0]["id"] == "https://example.com/2"
+    assert items[1]["id"] == "post-1"
+
+
+def test_parse_stops_at_max_items_and_accepts_chunks():
+    chunks = [RSS[i:i + 16] for i in range(0, len(RSS), 16)]
+    assert [item["title"] for item in ur.parse_rss_or_atom(chunks, max_items=1)] == ["Second"]
+
+
+def test_atom_entries_use_href_and_updated():
+    (item,) = ur.parse_rss_or_atom(ATOM)
+    assert item == {"title": "Atom post", "link": "https://example.com/a",
+                    "published": "2026-06-03T08:00:00Z", "id": "urn:a"}
+
+
+def test_unknown_root_yields_nothing():
+    assert ur.parse_rss_or_atom(b"<html><body/></html>") == []
+
+
+def test_merge_orders_newest_first_and_drops_duplicate_links():
+    blog = ur.parse_rss_or_atom(RSS)
+    notes = ur.parse_rss_or_atom(ATOM) + [dict(blog[0], title="Cross-post")]
+    merged = ur.merge_posts([blog, notes], max_items=5)
+    assert [post["title"] for post in merged] == ["Atom post", "Second", "First"]
+    assert merged[0]["published"] == "2026-06-03T08:00:00+00:00"
+
+
+def test_merge_keeps_max_items():
+    assert len(ur.merge_posts([ur.parse_rss_or_atom(RSS), ur.parse_rss_or_atom(ATOM)], max_items=2)) == 2
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+import update_readme as ur
+
+
+def write_manifest(tmp_path, manifest):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(manifest))
+    return str(path)
+
+
+def test_profiles_get_default_paths(tmp_path):
+    bob = {"login": "bob", "config": {"graphql": {"page_size": 20}}}
+    manifest = ur.load_manifest(write_manifest(tmp_path, ["alice", bob]))
+    alice, bob = manifest["profiles"]
+    assert alice["readme"] == "profiles/alice/README.md"
+    assert alice["config"] == {}
+    assert bob["config"] == {"graphql": {"page_size": 20}}
+
+
+@pytest.mark.parametrize("config, key", [
+    ({"cache": {"max_bytes": 1}}, "cache"),
+    ({"graphql": {"page_size": 20, "max_in_flight": 2}}, "graphql.max_in_flight"),
+    ({"deadline": {"seconds": 5}}, "deadline"),
+])
+def test_process_wide_settings_are_refused(tmp_path, config, key):
+    path = write_manifest(tmp_path, [{"login": "alice", "config": config}])
+    with pytest.raises(ValueError, match=key):
+        ur.load_manifest(path)
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from state_store import StateStore
+
+STATE = {
+    "feeds": {"https://example.com/rss": {"etag": '"abc"', "seen": ["1"], "posts": []}},
+    "commit_history": {"total": 3, "repos": {"me/app": {"cursor": "c1", "count": 3}}},
+    "sections": {"blog": {"digest": "d"}},
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with StateStore(str(tmp_path / "state.sqlite"), str(tmp_path / "cache" / "local.sqlite")) as store:
+        yield store
+
+
+def test_json_state_is_migrated_and_removed(store, tmp_path):
+    json_path = tmp_path / "state.json"
+    json_path.write_text(json.dumps(STATE))
+    assert store.load("state.json", str(json_path)) == STATE
+    assert not json_path.exists()
+    assert store.load("state.json", str(json_path)) == STATE
+
+
+def test_corrupt_json_state_starts_empty(store, tmp_path):
+    json_path = tmp_path / "state.json"
+    json_path.write_text('{"feeds": ')
+    assert store.load("state.json", str(json_path)) == {}
+    assert not json_path.exists()
+
+
+def test_save_writes_only_changed_rows(store):
+    assert store.save("a", STATE) == 4
+    assert store.save("a", STATE) == 0
+    state = store.load("a")
+    state["commit_history"]["repos"]["me/app"]["count"] = 4
+    state["commit_history"]["repos"]["me/lib"] = {"cursor": "c2", "count": 1}
+    del state["sections"]
+    assert store.save("a", state) == 3
+    assert store.load("a") == state
+
+
+def test_scopes_are_kept_apart(store):
+    store.save("a", STATE)
+    store.save("b", {"sections": {}})
+    assert store.load("a") == STATE
+    assert store.load("b") == {"sections": {}}
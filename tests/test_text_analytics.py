@@ -0,0 +1,47 @@
+from text_analytics import SpaceSaving, CommitTextAnalyzer
+
+
+def full_summary():
+    return SpaceSaving(3, {"alpha": [10, 0], "bravo": [9, 0], "charlie": [8, 0]})
+
+
+def test_counts_are_exact_below_capacity():
+    words = SpaceSaving(10)
+    words.update({"alpha": 2, "bravo": 1})
+    words.update({"alpha": 3})
+    assert words.most_common() == [("alpha", 5), ("bravo", 1)]
+
+
+def test_newcomer_evicts_smallest_and_reports_lower_bound():
+    words = full_summary()
+    words.update({"zebra": 1})
+    assert "charlie" not in words.counts
+    # Tracked at the evicted floor plus one, but only one sighting is certain
+    assert words.counts["zebra"] == [9, 8]
+    assert words.most_common() == [("alpha", 10), ("bravo", 9), ("zebra", 1)]
+
+
+def test_most_common_ranks_by_lower_bound():
+    words = full_summary()
+    words.update({"zebra": 1})
+    assert words.most_common(2) == [("alpha", 10), ("bravo", 9)]
+    assert [word for word, _ in words.most_common()][-1] == "zebra"
+
+
+def test_merge_and_round_trip():
+    left, right = SpaceSaving(10), SpaceSaving(10)
+    left.update({"alpha": 2, "bravo": 1})
+    right.update({"alpha": 1, "delta": 4})
+    left.merge(right)
+    restored = SpaceSaving.from_dict(left.to_dict())
+    assert dict(restored.most_common()) == {"alpha": 3, "bravo": 1, "delta": 4}
+
+
+def test_analyzer_strips_prefixes_and_counts_oops():
+    analyzer = CommitTextAnalyzer(batch_size=2)
+    for message in ("feat(api): parser tokens", "oops parser", "docs(readme): tokens tokens"):
+        analyzer.add(message)
+    analyzer.flush()
+    assert analyzer.messages == 3
+    assert analyzer.oops == 1
+    assert dict(analyzer.words.most_common()) == {"parser": 2, "tokens": 3, "oops": 1}
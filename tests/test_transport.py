@@ -0,0 +1,71 @@
+import time
+import threading
+import http.server
+
+import pytest
+
+from deadline import Deadline, deadline_scope
+from transport import Transport
+
+
+class Trickle(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "40")
+        self.end_headers()
+        try:
+            for _ in range(40):
+                self.wfile.write(b"x")
+                self.wfile.flush()
+                if self.path != "/instant":
+                    time.sleep(0.03)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def trickle_url():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Trickle)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_trickled_body_stops_at_the_deadline(trickle_url):
+    transport = Transport(proxies={})
+    started = time.monotonic()
+    with deadline_scope(Deadline(0.3)), pytest.raises(TimeoutError):
+        transport.get(trickle_url, timeout=15)
+    assert time.monotonic() - started < 2
+
+
+def test_trickled_stream_stops_at_the_deadline(trickle_url):
+    transport = Transport(proxies={})
+    with deadline_scope(Deadline(0.3)), pytest.raises(TimeoutError):
+        with transport.stream("GET", trickle_url, timeout=15) as resp:
+            for _ in resp.body:
+                pass
+
+
+def test_body_is_read_in_full_without_a_deadline(trickle_url):
+    assert Transport(proxies={}).get(trickle_url).body == b"x" * 40
+
+
+def idle_connections(transport):
+    return [conn for idle in transport._idle.values() for conn in idle]
+
+
+def test_drained_connection_is_reused(trickle_url):
+    transport = Transport(proxies={})
+    transport.get(trickle_url + "instant")
+    pooled = idle_connections(transport)
+    transport.get(trickle_url + "instant")
+    assert len(pooled) == 1
+    assert idle_connections(transport) == pooled